@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import os
 import pandas as pd
 
 # Get the folder where this script lives
@@ -7,14 +9,19 @@ script_dir = Path(__file__).parent
 # Correct path to your CSV folder, relative to script
 csv_dir = script_dir.parent.parent / "data_raw" / "csvs"
 
+
+def read_cols(csv_file):
+    # Only the header row is needed to collect column names
+    return pd.read_csv(csv_file, nrows=0, encoding="utf-8").columns
+
+
 all_columns = set()
 
-for csv_file in csv_dir.glob("*.csv"):
-    df = pd.read_csv(csv_file, encoding="utf-8")
-    all_columns.update(df.columns)
+# Header reads are I/O-bound, so overlap them across threads
+with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+    for columns in executor.map(read_cols, csv_dir.glob("*.csv")):
+        all_columns.update(columns)
 
 print("All columns found across CSVs:")
 for col in sorted(all_columns):
     print(col)
-
-
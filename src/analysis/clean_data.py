@@ -1,86 +1,77 @@
 import pandas as pd
 import os
+from multiprocessing import Pool
 
 # ========= Helper functions =========
 
-def clean_simple_table(df, name):
-    """
-    For page31 and page33-like tables: they have unnamed first column and numeric values.
-    """
-    # Rename first unnamed column to 年
-    first_col = df.columns[0]
-    df = df.rename(columns={first_col: "年"})
-
-    # Melt into long format
-    df_long = df.melt(id_vars=["年"], var_name="category", value_name="value")
-
-    # Save
-    out_path = f"/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_processed/{name}_cleaned.csv"
-    df_long.to_csv(out_path, index=False, encoding="utf-8-sig")
+OUT_DIR = "/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_processed/"
 
-    print(f"Saved {name} cleaned table to data_processed/")
-    return df_long
 
-
-def clean_problem_table(df, name):
+def melt_and_save(df, name, var_name, value_name):
     """
-    For tables like page30_table3 and page30_table4: they have Unnamed column + problem types.
+    Shared path for all raw tables: rename the unnamed first column to 年, melt into long format and save.
     """
-    df = df.rename(columns={"Unnamed: 0": "年"})
+    # The pyarrow engine leaves the unnamed first header blank rather than "Unnamed: 0"
+    df = df.rename(columns={df.columns[0]: "年"})
 
-    df_long = df.melt(id_vars=["年"], 
-                      var_name="問題分類", 
-                      value_name="人数")
+    df_long = df.melt(id_vars=["年"], var_name=var_name, value_name=value_name)
 
-    out_path = f"/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_processed/{name}_cleaned.csv"
+    out_path = f"{OUT_DIR}{name}_cleaned.csv"
     df_long.to_csv(out_path, index=False, encoding="utf-8-sig")
 
     print(f"Saved {name} cleaned table to data_processed/")
     return df_long
 
 
-# ========= Load base age table (already working) =========
-
-file_age = "/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_raw/csvs/R6jisatsunojoukyou_page32_table1.csv"
-df_age = pd.read_csv(file_age)
+def clean_simple_table(df, name):
+    """
+    For page31 and page33-like tables: they have unnamed first column and numeric values.
+    """
+    return melt_and_save(df, name, "category", "value")
 
-df_age.rename(columns={"Unnamed: 0": "年"}, inplace=True)
 
-df_age_long = df_age.melt(id_vars=["年"], var_name="年齢層", value_name="人数")
+def clean_problem_table(df, name):
+    """
+    For tables like page30_table3 and page30_table4: they have Unnamed column + problem types.
+    """
+    return melt_and_save(df, name, "問題分類", "人数")
 
-df_age_long.to_csv(
-    "/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_processed/R6jisatsunojoukyou_page32_table1_cleaned.csv",
-    index=False,
-    encoding="utf-8-sig"
-)
 
-print("Saved page32 cleaned table to data_processed/")
+def clean_age_table(df, name):
+    """
+    For the page32 age table: unnamed year column + age brackets.
+    """
+    return melt_and_save(df, name, "年齢層", "人数")
 
 
-# ========= Load the other raw tables =========
+# ========= Raw tables and how to clean them =========
 
 base = "/home/yulia-chekhovska/Public-Health-Data-Engineering-Project-Japan-Suicide-Statistics-Pipeline/data_raw/csvs/"
 
-paths = {
-    "page33": base + "R6jisatsunojoukyou_page33_table1.csv",
-    "page31": base + "R6jisatsunojoukyou_page31_table1.csv",
-    "page30_table3": base + "R6jisatsunojoukyou_page30_table3.csv",
-    "page30_table4": base + "R6jisatsunojoukyou_page30_table4.csv",
-}
+tasks = [
+    (clean_age_table, base + "R6jisatsunojoukyou_page32_table1.csv", "R6jisatsunojoukyou_page32_table1"),
+    (clean_simple_table, base + "R6jisatsunojoukyou_page33_table1.csv", "page33"),
+    (clean_simple_table, base + "R6jisatsunojoukyou_page31_table1.csv", "page31"),
+    (clean_problem_table, base + "R6jisatsunojoukyou_page30_table3.csv", "page30_table3"),
+    (clean_problem_table, base + "R6jisatsunojoukyou_page30_table4.csv", "page30_table4"),
+]
 
-dataframes = {}
 
-for name, path in paths.items():
-    df = pd.read_csv(path)
-    dataframes[name] = df
+def clean_file(clean_fn, path, name):
+    """
+    Load one raw table and clean it. Runs inside a worker process, so the CSV is read there too.
+    """
+    # NumPy dtypes, as with the default parser, so counts with blanks stay floats in the output
+    df = pd.read_csv(path, engine="pyarrow")
     print(f"{name} columns:", list(df.columns))
-
-print("Loaded page33, page31, page30_table3, page30_table4")
+    clean_fn(df, name)
 
 
 # ========= Clean and save them =========
 
-clean_simple_table(dataframes["page33"], "page33")
-clean_simple_table(dataframes["page31"], "page31")
-clean_problem_table(dataframes["page30_table3"], "page30_table3")
-clean_problem_table(dataframes["page30_table4"], "page30_table4")
+if __name__ == "__main__":
+    # The tables are independent, so each one gets its own process
+    with Pool(len(tasks)) as pool:
+        pool.starmap(clean_file, tasks)
+
+    print("Cleaned page32, page33, page31, page30_table3, page30_table4")
@@ -41,6 +41,15 @@ WORK_YEARS_LEFT = {
     '80+': 0,
 }
 
+# -----------------------------------------------------------------------------
+# Derived: lifetime earnings lost per death by age bracket (JPY)
+# -----------------------------------------------------------------------------
+# SALARY_BY_AGE × WORK_YEARS_LEFT, precomputed once so callers do a single lookup.
+LIFETIME_EARNINGS_BY_AGE = {
+    age: salary * WORK_YEARS_LEFT.get(age, 0)
+    for age, salary in SALARY_BY_AGE.items()
+}
+
 # -----------------------------------------------------------------------------
 # Policy scenario assumptions
 # -----------------------------------------------------------------------------
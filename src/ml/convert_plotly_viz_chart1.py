@@ -1,7 +1,25 @@
-import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import os
-import assumptions
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from data_loader import get_age_df, get_gender_df, get_cause_df, get_policy_df
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Outputs are written next to this script regardless of the working directory
+HERE = Path(__file__).resolve().parent
+CHARTS_DIR = HERE / "charts"
+
+# Serialize figures with orjson when available; NumPy buffers skip per-element conversion.
+# Without it plotly keeps its default json engine
+if orjson is not None:
+    pio.json.config.default_engine = 'orjson'
 
 # ============================================================================
 # VISUAL THEME — MODERN, SUBTLE, POLICY-SAFE
@@ -30,74 +48,41 @@ def apply_global_layout(fig):
     return fig
 
 
+def write_chart_html(fig, path):
+    # Load plotly.js from the CDN instead of inlining the ~3 MB bundle into every file
+    fig.write_html(
+        path,
+        include_plotlyjs="cdn",
+        full_html=True,
+        include_mathjax=False,
+        validate=False,
+        config={"responsive": True}
+    )
+
+
 # ============================================================================
 # LOAD DATA
 # ============================================================================
 
-df_age = pd.read_csv("../../data_clean/age_cleaned.csv")
-df_gender = pd.read_csv("../../data_clean/gender_cleaned.csv")
-df_cause = pd.read_csv("../../data_clean/reason_cleaned.csv")
-
-df_gender = df_gender.rename(columns={
-    '自殺者_総数': 'total',
-    '自殺者_男性': 'male',
-    '自殺者_女性': 'female'
-})
-for col in ['total', 'male', 'female']:
-    df_gender[col] = pd.to_numeric(df_gender[col], errors='coerce')
-df_gender.dropna(inplace=True)
-
-issue_translation = {
-    'その他': 'Other',
-    '交男際（女男問女）題問題': 'Relationship issues',
-    '健康問題': 'Health issues',
-    '勤務問題': 'Work-related issues',
-    '学校問題': 'School issues',
-    '家庭問題': 'Family issues',
-    '経済・生活問題': 'Economic / Life issues'
-}
-df_cause['cause'] = df_cause['問題分類'].map(issue_translation)
-df_cause['count'] = pd.to_numeric(df_cause['人数'], errors='coerce')
-df_cause.dropna(subset=['cause', 'count'], inplace=True)
-
-df_age = df_age.rename(columns={'年齢層': 'age_group', '人数': 'suicides'})
-age_map = {
-    '0～9歳': '0-9', '10～19歳': '10-19', '20～29歳': '20-29',
-    '30～39歳': '30-39', '40～49歳': '40-49', '50～59歳': '50-59',
-    '60～69歳': '60-69', '70～79歳': '70-79', '80歳以上': '80+'
-}
-df_age['age_group'] = df_age['age_group'].map(age_map)
-df_age['suicides'] = pd.to_numeric(df_age['suicides'], errors='coerce')
-df_age.dropna(inplace=True)
+# Shared with suicide_prevention_report.py; see data_loader for the cleaning steps
+df_age = get_age_df()
+df_gender = get_gender_df()
+df_cause = get_cause_df()
 
 
 # ============================================================================
 # ECONOMIC MODEL
 # ============================================================================
 
-df_age_total = df_age.groupby('age_group', as_index=False)['suicides'].sum()
-df_age_total['lifetime_earnings_yen'] = df_age_total['age_group'].apply(
-    lambda a: assumptions.SALARY_BY_AGE.get(a, 0) * assumptions.WORK_YEARS_LEFT.get(a, 0)
-)
-
-df_econ = df_age_total.copy()
-df_econ['annual_loss_yen'] = df_econ['suicides'] * df_econ['lifetime_earnings_yen']
-
-df_policy = df_econ.copy()
-df_policy['loss_prevented'] = df_policy['annual_loss_yen'] * assumptions.SUICIDE_REDUCTION_RATE
-df_policy['intervention_cost'] = df_policy['age_group'].map(assumptions.INTERVENTION_COST_BY_AGE)
-df_policy['roi'] = df_policy['loss_prevented'] / df_policy['intervention_cost']
-
-# Pull baseline and reduced loss from assumptions.py
-df_policy['baseline_loss'] = df_policy['annual_loss_yen'].apply(assumptions.baseline_loss)
-df_policy['reduced_loss'] = df_policy['annual_loss_yen'].apply(assumptions.reduced_loss)
+# Shared with suicide_prevention_report.py; see data_loader.calculate_economic_impact
+df_policy = get_policy_df()
 
 
 # ============================================================================
 # CHARTS
 # ============================================================================
 
-def create_suicide_trends_unified():
+def create_suicide_trends_unified(df_age):
     fig = px.line(
         df_age, x='year', y='suicides', color='age_group',
         title='Suicide Trends by Age Group (Japan)',
@@ -109,9 +94,9 @@ def create_suicide_trends_unified():
     return apply_global_layout(fig)
 
 
-def create_economic_loss_by_age():
+def create_economic_loss_by_age(df_policy):
     # Convert annual loss to billions for readability
-    df_econ_plot = df_econ.copy()
+    df_econ_plot = df_policy.copy()
     df_econ_plot['loss_billion'] = df_econ_plot['annual_loss_yen'] / 1e9
 
     # Horizontal bar chart
@@ -148,7 +133,7 @@ def create_economic_loss_by_age():
 
 
 
-def create_roi_by_age():
+def create_roi_by_age(df_policy):
     fig = px.bar(
         df_policy, x='age_group', y='roi',
         title='Return on Investment by Age Group',
@@ -163,16 +148,17 @@ def create_roi_by_age():
     return apply_global_layout(fig)
 
 
-def create_cause_heatmap():
-    # Pivot table: rows = year, columns = cause, values = count proportion
-    pivot = df_cause.pivot_table(
-        index='year', columns='cause', values='count', aggfunc='sum', fill_value=0
-    )
-    pivot_pct = pivot.div(pivot.sum(axis=1), axis=0) * 100  # convert to %
+def create_cause_heatmap(df_cause):
+    # Rows = year, columns = cause, values = count; normalize each row to % in place
+    counts = df_cause.groupby(['year', 'cause'], observed=True)['count'].sum().unstack(fill_value=0)
+    pct = counts.to_numpy(dtype=float, copy=True)
+    pct *= 100.0 / pct.sum(axis=1, keepdims=True)
     
     # Create heatmap
     fig = px.imshow(
-        pivot_pct,
+        pct,
+        x=counts.columns.tolist(),
+        y=counts.index.tolist(),
         aspect='auto',
         color_continuous_scale='Greens',
         text_auto='.1f',  # show percentage inside cells
@@ -247,103 +233,121 @@ def create_policy_scenario_comparison(df_policy):
 
 
 # ============================================================================
-# SAVE OUTPUTS
+# ISO-IMPACT CONTOUR
 # ============================================================================
 
-if __name__ == "__main__":
-    os.makedirs("charts", exist_ok=True)
-
-    create_suicide_trends_unified().write_html("charts/suicide_trends_unified.html")
-    create_economic_loss_by_age().write_html("charts/economic_loss_by_age.html")
-    create_roi_by_age().write_html("charts/roi_by_age.html")
-    create_cause_heatmap().write_html("charts/cause_heatmap.html")
-    create_policy_scenario_comparison(df_policy).write_html("charts/policy_scenario_comparison.html")
-
-    print("✅ All charts generated with modern visual styling.")
-
-
-import numpy as np
-import plotly.graph_objects as go
-
-# =========================
-# DATA (FROM YOUR MODEL)
-# =========================
-
+# Data from the youth model
 YOUTH_POPULATION = 6_950_000
 SUICIDE_RATE_PER_100K = 20.8914772727
 
-reach_pct = np.linspace(0.008, 0.02, 60)     # 0.8% → 2.0%
-effectiveness = np.linspace(0.15, 0.35, 60)
-
-R, E = np.meshgrid(reach_pct, effectiveness)
-
-individuals_reached = R * YOUTH_POPULATION
-expected_deaths = individuals_reached * SUICIDE_RATE_PER_100K / 100_000
-lives_saved = expected_deaths * E
-
-# =========================
-# CONTOUR PLOT
-# =========================
-
-fig = go.Figure()
-
-fig.add_trace(go.Contour(
-    x=reach_pct * 100,
-    y=effectiveness * 100,
-    z=lives_saved,
-    colorscale=COLOR_SCALE_GREEN,
-    contours=dict(
-        showlabels=True,
-        labelfont=dict(size=12)
-    ),
-    hovertemplate=(
-        "Reach: %{x:.2f}%<br>"
-        "Effectiveness: %{y:.1f}%<br>"
-        "Lives saved: %{z:.2f}<extra></extra>"
-    )
-))
 
-# =========================
-# SCENARIO POINTS
-# =========================
+def create_impact_contour():
+    reach_pct = np.linspace(0.008, 0.02, 60)     # 0.8% → 2.0%
+    effectiveness = np.linspace(0.15, 0.35, 60)
+
+    # Expected deaths per unit of reach; scaling the 1-D reach axis first leaves a single
+    # outer product as the only (effectiveness × reach) grid allocation
+    deaths_per_reach = YOUTH_POPULATION * SUICIDE_RATE_PER_100K / 100_000
+    lives_saved = np.outer(effectiveness, reach_pct * deaths_per_reach)
+
+    # =========================
+    # CONTOUR PLOT
+    # =========================
+    fig = go.Figure()
+
+    fig.add_trace(go.Contour(
+        x=reach_pct * 100,
+        y=effectiveness * 100,
+        z=lives_saved,
+        colorscale=COLOR_SCALE_GREEN,
+        contours=dict(
+            showlabels=True,
+            labelfont=dict(size=12)
+        ),
+        hovertemplate=(
+            "Reach: %{x:.2f}%<br>"
+            "Effectiveness: %{y:.1f}%<br>"
+            "Lives saved: %{z:.2f}<extra></extra>"
+        )
+    ))
 
-scenarios = {
-    "Conservative": (1.15, 15, 2.50),
-    "Moderate": (1.15, 25, 4.16),
-    "Optimistic": (1.15, 35, 5.83)
-}
+    # =========================
+    # SCENARIO POINTS
+    # =========================
+
+    scenarios = {
+        "Conservative": (1.15, 15, 2.50),
+        "Moderate": (1.15, 25, 4.16),
+        "Optimistic": (1.15, 35, 5.83)
+    }
+
+    # All scenario markers share one trace; per-point values go through text/customdata
+    reach, eff, saved = zip(*scenarios.values())
 
-for name, (r, e, z) in scenarios.items():
     fig.add_trace(go.Scatter(
-        x=[r],
-        y=[e],
+        x=reach,
+        y=eff,
         mode="markers+text",
         marker=dict(size=10, color="#0B5D3B"),
-        text=[name],
+        text=list(scenarios),
         textposition="top center",
+        customdata=saved,
         hovertemplate=(
-            f"{name}<br>"
-            f"Reach: {r:.2f}%<br>"
-            f"Effectiveness: {e:.0f}%<br>"
-            f"Lives saved: {z:.2f}<extra></extra>"
+            "%{text}<br>"
+            "Reach: %{x:.2f}%<br>"
+            "Effectiveness: %{y:.0f}%<br>"
+            "Lives saved: %{customdata:.2f}<extra></extra>"
         ),
         showlegend=False
     ))
 
-# =========================
-# LAYOUT
-# =========================
+    # =========================
+    # LAYOUT
+    # =========================
+
+    fig.update_layout(
+        title="Iso-Impact Map: Annual Lives Saved",
+        xaxis_title="Program Reach (% of youth population)",
+        yaxis_title="Intervention Effectiveness (%)",
+        margin=dict(l=60, r=40, t=60, b=60)
+    )
+
+    apply_global_layout(fig)
+
+    return fig
+
 
-fig.update_layout(
-    title="Iso-Impact Map: Annual Lives Saved",
-    xaxis_title="Program Reach (% of youth population)",
-    yaxis_title="Intervention Effectiveness (%)",
-    margin=dict(l=60, r=40, t=60, b=60)
-)
+# ============================================================================
+# SAVE OUTPUTS
+# ============================================================================
+
+# Output name -> (builder, frame it is built from); every chart reads the frames
+# prepared once above instead of re-deriving them
+CHARTS = {
+    "suicide_trends_unified": (create_suicide_trends_unified, df_age),
+    "economic_loss_by_age": (create_economic_loss_by_age, df_policy),
+    "roi_by_age": (create_roi_by_age, df_policy),
+    "cause_heatmap": (create_cause_heatmap, df_cause),
+    "policy_scenario_comparison": (create_policy_scenario_comparison, df_policy),
+}
+
+
+def render_chart(name):
+    # Runs in a worker process: only the chart name is sent over, figures never cross processes
+    builder, df = CHARTS[name]
+    write_chart_html(builder(df), CHARTS_DIR / f"{name}.html")
+    return name
 
-apply_global_layout(fig)
 
-fig.write_html(
-    "impact_contour_lives_saved.html",
-    include_plotlyjs="cdn"
-)
+if __name__ == "__main__":
+    os.makedirs(CHARTS_DIR, exist_ok=True)
+
+    # Figure building and JSON encoding are CPU-bound and the files are independent,
+    # so render the charts in parallel
+    with ProcessPoolExecutor(max_workers=len(CHARTS)) as executor:
+        list(executor.map(render_chart, CHARTS))
+
+    write_chart_html(create_impact_contour(), HERE / "impact_contour_lives_saved.html")
+
+    print("✅ All charts generated with modern visual styling.")
+
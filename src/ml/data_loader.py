@@ -0,0 +1,225 @@
+"""
+Shared loading and cleaning of the cleaned suicide statistics tables.
+
+Both the chart script and the metric extraction pipeline read their inputs
+through the getters below. Each getter is memoized, so within one process
+every table is parsed and cleaned once and the same DataFrame object is
+returned to every caller; callers must not mutate it in place.
+
+Prepared DataFrames are also persisted next to their source CSVs in
+data_clean/ as Parquet, so later runs skip CSV parsing and the cleaning
+steps entirely. Cache file names include a hash of this module's source,
+so editing a builder (or the label maps it uses) rebuilds the frames.
+
+The economic model built on the age table lives here as well, so both
+scripts share one memoized policy frame instead of each deriving their own.
+"""
+
+import csv
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import assumptions
+
+# Resolved from this file rather than the working directory, so worker processes
+# and runs from other directories find the same data
+DATA_CLEAN_DIR = Path(__file__).resolve().parents[2] / "data_clean"
+
+ISSUE_TRANSLATION = {
+    'その他': 'Other',
+    '交男際（女男問女）題問題': 'Relationship issues',
+    '健康問題': 'Health issues',
+    '勤務問題': 'Work-related issues',
+    '学校問題': 'School issues',
+    '家庭問題': 'Family issues',
+    '経済・生活問題': 'Economic / Life issues'
+}
+
+# Hash of this module's source, part of every cache file name: frames prepared by an
+# older version of the builders are never read back
+BUILDERS_DIGEST = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+# Placeholders the source tables use for missing counts
+NA_VALUES = ['', '-', 'N/A', '—']
+
+AGE_MAP = {
+    '0～9歳': '0-9', '10～19歳': '10-19', '20～29歳': '20-29',
+    '30～39歳': '30-39', '40～49歳': '40-49', '50～59歳': '50-59',
+    '60～69歳': '60-69', '70～79歳': '70-79', '80歳以上': '80+'
+}
+
+
+def load_or_build(name, builder, tag):
+    """
+    Return the prepared DataFrame for data_clean/{name}.csv, cached as Parquet.
+
+    Args:
+        name: Base name of the cleaned CSV (e.g. 'age_cleaned')
+        builder: Callable taking the CSV path and returning the prepared DataFrame
+        tag: Distinguishes caches of differently prepared frames built from the same CSV
+
+    Returns:
+        DataFrame: Cached frame if it is at least as new as the CSV and was built by
+        the current builders, otherwise a fresh build
+    """
+    csv_path = DATA_CLEAN_DIR / f"{name}.csv"
+    parquet_path = DATA_CLEAN_DIR / f"{name}.{tag}.{BUILDERS_DIGEST}.parquet"
+
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+
+    df = builder(csv_path)
+    # Caches left by earlier versions of the builders can never match again
+    for stale in DATA_CLEAN_DIR.glob(f"{name}.{tag}.*.parquet"):
+        stale.unlink(missing_ok=True)
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    return df
+
+
+def build_gender_df(csv_path):
+    """Read the gender table and standardize its count columns."""
+    # Only parse the columns downstream code actually uses; counts are typed at parse time,
+    # so unparseable cells arrive as <NA> without a separate to_numeric pass
+    df_gender = pd.read_csv(
+        csv_path,
+        engine='pyarrow',
+        usecols=['year', '自殺者_総数', '自殺者_男性', '自殺者_女性'],
+        dtype={'自殺者_総数': 'Int32', '自殺者_男性': 'Int32', '自殺者_女性': 'Int32'},
+        na_values=NA_VALUES
+    )
+    df_gender = df_gender.rename(columns={
+        '自殺者_総数': 'total',
+        '自殺者_男性': 'male',
+        '自殺者_女性': 'female'
+    }).dropna(subset=['total', 'male', 'female'])
+    # Counts fit comfortably in 32 bits; halve the bytes every later aggregation touches
+    return df_gender.astype({'total': 'int32', 'male': 'int32', 'female': 'int32'})
+
+
+def build_cause_df(csv_path):
+    """Read the cause table and translate cause categories."""
+    # Causes are translated while parsing (unknown labels become None); converters
+    # are not supported by the pyarrow engine, so this table uses the C parser
+    df_cause = pd.read_csv(
+        csv_path,
+        usecols=['year', '問題分類', '人数'],
+        dtype={'人数': 'Int32'},
+        converters={'問題分類': ISSUE_TRANSLATION.get},
+        na_values=NA_VALUES
+    )
+    df_cause = df_cause.rename(columns={'問題分類': 'cause', '人数': 'count'}).dropna(subset=['cause', 'count'])
+    df_cause['count'] = df_cause['count'].astype('int32')
+    # Fixed vocabulary, sorted so grouped output keeps the alphabetical cause order
+    df_cause['cause'] = pd.Categorical(df_cause['cause'], categories=sorted(ISSUE_TRANSLATION.values()))
+    return df_cause
+
+
+def build_age_df(csv_path):
+    """Read the age table and standardize age group labels."""
+    df_age = pd.read_csv(
+        csv_path,
+        engine='pyarrow',
+        usecols=['year', '年齢層', '人数'],
+        dtype={'人数': 'Int32'},
+        na_values=NA_VALUES
+    )
+    df_age = df_age.rename(columns={'年齢層': 'age_group', '人数': 'suicides'})
+    # Labels outside AGE_MAP (不詳, 合計) become NaN; only the category index is renamed
+    df_age['age_group'] = (
+        df_age['age_group']
+        .astype('category')
+        .cat.set_categories(list(AGE_MAP))
+        .cat.rename_categories(AGE_MAP)
+        .cat.as_ordered()
+    )
+    # Missing values can only come from blank counts or from age labels outside AGE_MAP
+    df_age = df_age.dropna(subset=['suicides', 'age_group'])
+    return df_age.astype({'suicides': 'int32', 'year': 'int16'})
+
+
+@lru_cache(maxsize=None)
+def get_source_shape(name):
+    """(rows, columns) of data_clean/{name}.csv as stored, before column selection or cleaning."""
+    with open(DATA_CLEAN_DIR / f"{name}.csv", encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        n_columns = len(next(reader))
+        n_rows = sum(1 for row in reader if row)
+    return n_rows, n_columns
+
+
+@lru_cache(maxsize=1)
+def get_age_df():
+    """Age-stratified suicide counts: year, age_group (ordered categorical), suicides."""
+    return load_or_build('age_cleaned', build_age_df, tag='prepared')
+
+
+@lru_cache(maxsize=1)
+def get_gender_df():
+    """Gender-disaggregated suicide counts: year, total, male, female."""
+    return load_or_build('gender_cleaned', build_gender_df, tag='prepared')
+
+
+@lru_cache(maxsize=1)
+def get_cause_df():
+    """Cause-specific suicide counts: year, cause (English, categorical), count."""
+    return load_or_build('reason_cleaned', build_cause_df, tag='prepared')
+
+
+def calculate_economic_impact(df_age):
+    """
+    Calculate economic loss metrics using human capital approach.
+    
+    Args:
+        df_age: DataFrame with age-stratified suicide counts (categorical age_group)
+        
+    Returns:
+        DataFrame: One row per observed age group with economic impact and policy scenario columns
+    """
+    # age_group is categorical, so per-age totals are a single bincount over its integer codes
+    # (in AGE_MAP order); groups with no rows are dropped, matching groupby(observed=True)
+    age_codes = df_age['age_group'].cat.codes.to_numpy()
+    age_categories = df_age['age_group'].cat.categories
+    n_ages = len(age_categories)
+    age_present = np.bincount(age_codes, minlength=n_ages) > 0
+    suicides = np.bincount(age_codes, weights=df_age['suicides'].to_numpy(), minlength=n_ages)
+
+    # Per-category lookup arrays, gathered by the codes of the age groups actually present
+    lifetime_earnings = np.array(
+        [assumptions.LIFETIME_EARNINGS_BY_AGE.get(a, 0) for a in age_categories], dtype=np.int64
+    )
+    intervention_cost = np.array(
+        [assumptions.INTERVENTION_COST_BY_AGE[a] for a in age_categories], dtype=np.int64
+    )
+
+    # Every column is computed on arrays and the frame is built once, rather than grown
+    # column by column; assumptions.baseline_loss / reduced_loss are scalar multiplies
+    suicides = suicides[age_present].astype(np.int64)
+    lifetime_earnings = lifetime_earnings[age_present]
+    intervention_cost = intervention_cost[age_present]
+    annual_loss = suicides * lifetime_earnings
+    loss_prevented = annual_loss * assumptions.SUICIDE_REDUCTION_RATE
+
+    df_policy = pd.DataFrame({
+        'age_group': pd.Categorical(age_categories, categories=age_categories, ordered=True)[age_present],
+        'suicides': suicides,
+        'lifetime_earnings_yen': lifetime_earnings,
+        'annual_loss_yen': annual_loss,
+        'loss_prevented': loss_prevented,
+        'intervention_cost': intervention_cost,
+        'roi': loss_prevented / intervention_cost,
+        'baseline_loss': annual_loss,
+        'reduced_loss': annual_loss * (1 - assumptions.SUICIDE_REDUCTION_RATE),
+        'net_benefit': loss_prevented - intervention_cost,
+    })
+
+    return df_policy
+
+
+@lru_cache(maxsize=1)
+def get_policy_df():
+    """Economic impact and policy scenario metrics per age group, derived from get_age_df()."""
+    return calculate_economic_impact(get_age_df())
@@ -10,94 +10,31 @@ analysis workflows.
 import pandas as pd
 import numpy as np
 import json
-import sys
-import os
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-sys.path.append('../../')
 import assumptions
+from data_loader import get_age_df, get_gender_df, get_cause_df, get_policy_df, get_source_shape
+
+# Outputs are written next to this script regardless of the working directory
+HERE = Path(__file__).resolve().parent
 
 
 def load_and_prepare_data():
     """
     Load raw data files and apply standardized transformations.
     
-    Returns:
-        tuple: (df_age, df_gender, df_cause) - cleaned dataframes
-    """
-    df_age = pd.read_csv("../../data_clean/age_cleaned.csv")
-    df_gender = pd.read_csv("../../data_clean/gender_cleaned.csv")
-    df_cause = pd.read_csv("../../data_clean/reason_cleaned.csv")
-    
-    # Standardize gender data column names
-    df_gender = df_gender.rename(columns={
-        '自殺者_総数': 'total',
-        '自殺者_男性': 'male',
-        '自殺者_女性': 'female'
-    })
-    
-    for col in ['total', 'male', 'female']:
-        df_gender[col] = pd.to_numeric(df_gender[col], errors='coerce')
-    df_gender.dropna(inplace=True)
-    
-    # Translate and clean cause categories
-    issue_translation = {
-        'その他': 'Other',
-        '交男際（女男問女）題問題': 'Relationship issues',
-        '健康問題': 'Health issues',
-        '勤務問題': 'Work-related issues',
-        '学校問題': 'School issues',
-        '家庭問題': 'Family issues',
-        '経済・生活問題': 'Economic / Life issues'
-    }
-    
-    df_cause['cause'] = df_cause['問題分類'].map(issue_translation)
-    df_cause['count'] = pd.to_numeric(df_cause['人数'], errors='coerce')
-    df_cause.dropna(subset=['cause', 'count'], inplace=True)
+    Cleaning is shared with the chart pipeline through data_loader, which
+    memoizes each frame and caches it as Parquet next to the CSVs.
     
-    # Standardize age group labels
-    df_age = df_age.rename(columns={'年齢層': 'age_group', '人数': 'suicides'})
-    
-    age_map = {
-        '0～9歳': '0-9', '10～19歳': '10-19', '20～29歳': '20-29',
-        '30～39歳': '30-39', '40～49歳': '40-49', '50～59歳': '50-59',
-        '60～69歳': '60-69', '70～79歳': '70-79', '80歳以上': '80+'
-    }
-    
-    df_age['age_group'] = df_age['age_group'].map(age_map)
-    df_age['suicides'] = pd.to_numeric(df_age['suicides'], errors='coerce')
-    df_age.dropna(inplace=True)
-    
-    return df_age, df_gender, df_cause
-
-
-def calculate_economic_impact(df_age):
-    """
-    Calculate economic loss metrics using human capital approach.
-    
-    Args:
-        df_age: DataFrame with age-stratified suicide counts
-        
     Returns:
-        DataFrame: Extended metrics including economic impact and policy scenarios
+        tuple: (df_age, df_gender, df_cause) - cleaned dataframes
     """
-    df_age_total = df_age.groupby('age_group', as_index=False)['suicides'].sum()
-    
-    df_age_total['lifetime_earnings_yen'] = df_age_total['age_group'].apply(
-        lambda a: assumptions.SALARY_BY_AGE.get(a, 0) * assumptions.WORK_YEARS_LEFT.get(a, 0)
-    )
-    
-    df_econ = df_age_total.copy()
-    df_econ['annual_loss_yen'] = df_econ['suicides'] * df_econ['lifetime_earnings_yen']
-    
-    df_policy = df_econ.copy()
-    df_policy['loss_prevented'] = df_policy['annual_loss_yen'] * assumptions.SUICIDE_REDUCTION_RATE
-    df_policy['intervention_cost'] = df_policy['age_group'].map(assumptions.INTERVENTION_COST_BY_AGE)
-    df_policy['roi'] = df_policy['loss_prevented'] / df_policy['intervention_cost']
-    df_policy['baseline_loss'] = df_policy['annual_loss_yen'].apply(assumptions.baseline_loss)
-    df_policy['reduced_loss'] = df_policy['annual_loss_yen'].apply(assumptions.reduced_loss)
-    df_policy['net_benefit'] = df_policy['loss_prevented'] - df_policy['intervention_cost']
-    
-    return df_policy
+    return get_age_df(), get_gender_df(), get_cause_df()
 
 
 def extract_summary_metrics(df_policy):
@@ -110,19 +47,33 @@ def extract_summary_metrics(df_policy):
     Returns:
         dict: Summary statistics for overall economic burden and intervention impact
     """
+    # Reduce every column once; the scaled and ratio metrics reuse these scalars
+    totals = df_policy.agg({
+        'annual_loss_yen': 'sum',
+        'suicides': 'sum',
+        'loss_prevented': 'sum',
+        'intervention_cost': 'sum',
+        'net_benefit': 'sum',
+        'lifetime_earnings_yen': 'mean'
+    })
+    annual_loss = float(totals['annual_loss_yen'])
+    loss_prevented = float(totals['loss_prevented'])
+    intervention_cost = float(totals['intervention_cost'])
+    net_benefit = float(totals['net_benefit'])
+    
     return {
-        'total_annual_loss_yen': float(df_policy['annual_loss_yen'].sum()),
-        'total_annual_loss_billion': float(df_policy['annual_loss_yen'].sum() / 1e9),
-        'total_suicides': int(df_policy['suicides'].sum()),
-        'total_loss_prevented_yen': float(df_policy['loss_prevented'].sum()),
-        'total_loss_prevented_billion': float(df_policy['loss_prevented'].sum() / 1e9),
-        'total_intervention_cost_yen': float(df_policy['intervention_cost'].sum()),
-        'total_intervention_cost_billion': float(df_policy['intervention_cost'].sum() / 1e9),
-        'total_net_benefit_yen': float(df_policy['net_benefit'].sum()),
-        'total_net_benefit_billion': float(df_policy['net_benefit'].sum() / 1e9),
-        'overall_roi': float(df_policy['loss_prevented'].sum() / df_policy['intervention_cost'].sum()),
+        'total_annual_loss_yen': annual_loss,
+        'total_annual_loss_billion': annual_loss / 1e9,
+        'total_suicides': int(totals['suicides']),
+        'total_loss_prevented_yen': loss_prevented,
+        'total_loss_prevented_billion': loss_prevented / 1e9,
+        'total_intervention_cost_yen': intervention_cost,
+        'total_intervention_cost_billion': intervention_cost / 1e9,
+        'total_net_benefit_yen': net_benefit,
+        'total_net_benefit_billion': net_benefit / 1e9,
+        'overall_roi': loss_prevented / intervention_cost,
         'intervention_effectiveness_rate': assumptions.SUICIDE_REDUCTION_RATE,
-        'avg_lifetime_earnings_million': float(df_policy['lifetime_earnings_yen'].mean() / 1e6)
+        'avg_lifetime_earnings_million': float(totals['lifetime_earnings_yen']) / 1e6
     }
 
 
@@ -136,30 +87,29 @@ def extract_age_breakdown(df_policy):
     Returns:
         list: Dictionaries containing age-specific metrics
     """
-    age_breakdown = []
-    
-    for _, row in df_policy.iterrows():
-        age_breakdown.append({
-            'age_group': row['age_group'],
-            'total_suicides': int(row['suicides']),
-            'baseline_loss_yen': float(row['baseline_loss']),
-            'baseline_loss_billion': float(row['baseline_loss'] / 1e9),
-            'loss_per_person_yen': float(row['lifetime_earnings_yen']),
-            'loss_per_person_million': float(row['lifetime_earnings_yen'] / 1e6),
-            'intervention_cost_yen': float(row['intervention_cost']),
-            'intervention_cost_billion': float(row['intervention_cost'] / 1e9),
-            'loss_prevented_yen': float(row['loss_prevented']),
-            'loss_prevented_billion': float(row['loss_prevented'] / 1e9),
-            'reduced_loss_yen': float(row['reduced_loss']),
-            'reduced_loss_billion': float(row['reduced_loss'] / 1e9),
-            'net_benefit_yen': float(row['net_benefit']),
-            'net_benefit_billion': float(row['net_benefit'] / 1e9),
-            'roi': float(row['roi']),
-            'salary_yen': assumptions.SALARY_BY_AGE[row['age_group']],
-            'work_years_left': assumptions.WORK_YEARS_LEFT[row['age_group']]
-        })
+    # Build every output column as a vector op, then emit the rows in one call
+    age_groups = df_policy['age_group'].astype(str)
+    out = pd.DataFrame({
+        'age_group': age_groups,
+        'total_suicides': df_policy['suicides'].astype('int64'),
+        'baseline_loss_yen': df_policy['baseline_loss'].astype('float64'),
+        'baseline_loss_billion': df_policy['baseline_loss'] / 1e9,
+        'loss_per_person_yen': df_policy['lifetime_earnings_yen'].astype('float64'),
+        'loss_per_person_million': df_policy['lifetime_earnings_yen'] / 1e6,
+        'intervention_cost_yen': df_policy['intervention_cost'].astype('float64'),
+        'intervention_cost_billion': df_policy['intervention_cost'] / 1e9,
+        'loss_prevented_yen': df_policy['loss_prevented'].astype('float64'),
+        'loss_prevented_billion': df_policy['loss_prevented'] / 1e9,
+        'reduced_loss_yen': df_policy['reduced_loss'].astype('float64'),
+        'reduced_loss_billion': df_policy['reduced_loss'] / 1e9,
+        'net_benefit_yen': df_policy['net_benefit'].astype('float64'),
+        'net_benefit_billion': df_policy['net_benefit'] / 1e9,
+        'roi': df_policy['roi'].astype('float64'),
+        'salary_yen': age_groups.map(assumptions.SALARY_BY_AGE).astype('int64'),
+        'work_years_left': age_groups.map(assumptions.WORK_YEARS_LEFT).astype('int64')
+    })
     
-    return age_breakdown
+    return out.to_dict(orient='records')
 
 
 def extract_working_age_metrics(df_policy):
@@ -196,12 +146,16 @@ def extract_gender_summary(df_gender):
     Returns:
         dict: Gender distribution metrics
     """
+    # One reduction over all three columns; the percentages reuse the sums
+    sums = df_gender[['total', 'male', 'female']].sum()
+    total, male, female = int(sums['total']), int(sums['male']), int(sums['female'])
+
     return {
-        'total_deaths': int(df_gender['total'].sum()),
-        'male_deaths': int(df_gender['male'].sum()),
-        'female_deaths': int(df_gender['female'].sum()),
-        'male_percentage': float(df_gender['male'].sum() / df_gender['total'].sum() * 100),
-        'female_percentage': float(df_gender['female'].sum() / df_gender['total'].sum() * 100)
+        'total_deaths': total,
+        'male_deaths': male,
+        'female_deaths': female,
+        'male_percentage': male / total * 100,
+        'female_percentage': female / total * 100
     }
 
 
@@ -216,17 +170,18 @@ def extract_top_causes(df_cause, n=5):
     Returns:
         list: Top N causes with counts and percentages
     """
-    cause_summary = df_cause.groupby('cause')['count'].sum().sort_values(ascending=False)
-    top_causes = []
+    cause_totals = df_cause.groupby('cause', observed=True, sort=False)['count'].sum()
+    total = float(cause_totals.sum())
     
-    for cause, count in cause_summary.head(n).items():
-        top_causes.append({
+    # Partial selection of the top n; the grand total above is computed once
+    return [
+        {
             'cause': cause,
             'total_deaths': int(count),
-            'percentage': float(count / cause_summary.sum() * 100)
-        })
-    
-    return top_causes
+            'percentage': float(count) / total * 100
+        }
+        for cause, count in cause_totals.nlargest(n).items()
+    ]
 
 
 def extract_temporal_trends(df_age):
@@ -249,42 +204,44 @@ def extract_temporal_trends(df_age):
     return yearly_trends, years_available
 
 
-def convert_to_native_types(obj):
+def _native_leaf(obj):
     """
-    Recursively convert NumPy/Pandas types to native Python types for JSON serialization.
+    Convert a single NumPy/Pandas value to its native Python equivalent in one C call.
     
-    Args:
-        obj: Object to convert (can be nested dict/list)
-        
-    Returns:
-        Object with all NumPy/Pandas types converted to native Python equivalents
+    Raises:
+        TypeError: If obj is not a NumPy/Pandas value (mirrors the json ``default`` contract)
     """
-    if isinstance(obj, dict):
-        return {key: convert_to_native_types(val) for key, val in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_native_types(item) for item in obj]
-    elif isinstance(obj, (np.integer, pd.Int64Dtype)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, float)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (np.ndarray, pd.Series)):
         return obj.tolist()
-    else:
-        return obj
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient='records')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
-def save_metrics_to_json(data, filepath='extracted_metrics.json'):
+def save_metrics_to_json(data, filepath=HERE / 'extracted_metrics.json'):
     """
     Export metrics dictionary to JSON file with proper type handling.
     
+    Serialized in a single pass with orjson when available (NumPy values are
+    encoded natively); otherwise falls back to the stdlib json module. Either
+    way, remaining NumPy/Pandas values are converted by _native_leaf.
+    
     Args:
         data: Dictionary containing all extracted metrics
         filepath: Output file path
     """
-    data_clean = convert_to_native_types(data)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data_clean, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        payload = orjson.dumps(
+            data,
+            default=_native_leaf,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        Path(filepath).write_bytes(payload)
+    else:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=_native_leaf)
     
     return filepath
 
@@ -341,7 +298,8 @@ def main():
     df_age, df_gender, df_cause = load_and_prepare_data()
     print("Data loading complete.")
     
-    df_policy = calculate_economic_impact(df_age)
+    # Memoized in data_loader and shared with the chart pipeline
+    df_policy = get_policy_df()
     print("Economic impact calculations complete.")
     
     summary_metrics = extract_summary_metrics(df_policy)
@@ -359,10 +317,15 @@ def main():
         'top_causes': top_causes,
         'yearly_trends': yearly_trends,
         'years_available': years_available,
+        # *_data_shape: the cleaned CSVs as stored; *_prepared_shape: the frames the
+        # metrics are computed from (only the columns they use)
         'data_sources': {
-            'age_data_shape': df_age.shape,
-            'gender_data_shape': df_gender.shape,
-            'cause_data_shape': df_cause.shape
+            'age_data_shape': get_source_shape('age_cleaned'),
+            'gender_data_shape': get_source_shape('gender_cleaned'),
+            'cause_data_shape': get_source_shape('reason_cleaned'),
+            'age_prepared_shape': df_age.shape,
+            'gender_prepared_shape': df_gender.shape,
+            'cause_prepared_shape': df_cause.shape
         }
     }
     
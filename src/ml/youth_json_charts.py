@@ -1,126 +1,174 @@
+import gzip
+import hashlib
 import json
+import mmap
+import os
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Cost table line items as (item, annual JPY) pairs, with their totals summed once at import.
+# Note: These are the default estimates from NonprofitCostCalculator
+# Adjust these to match your actual staff costs
+STAFF_COSTS = (
+    ('Workshop Facilitator 1 (Part-time)', 2_000_000),
+    ('Workshop Facilitator 2 (Part-time)', 2_000_000),
+    ('Workshop Facilitator 3 (Part-time)', 2_000_000),
+    ('Lead Outreach Coordinator (Full-time)', 3_000_000),
+    ('Program Coordinator (Full-time)', 1_500_000),
+    ('Admin Support (10% allocation)', 500_000),
+)
+
+OPERATING_COSTS = (
+    ('Workshop Materials', 300_000),
+    ('Transportation', 400_000),
+    ('Hotline Infrastructure (Phone/Software)', 200_000),
+    ('Staff Training', 150_000),
+    ('Outreach Materials', 200_000),
+    ('Miscellaneous Supplies', 150_000),
+)
+
+TOTAL_STAFF_COST = sum(cost for _, cost in STAFF_COSTS)
+TOTAL_OPERATING_COST = sum(cost for _, cost in OPERATING_COSTS)
+
+# Set YOUTH_TABLES_GZIP=1 to write each table as .html.gz for web serving instead of plain .html
+GZIP_OUTPUT = os.environ.get('YOUTH_TABLES_GZIP') == '1'
+
+# Reports at least this large are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD_BYTES = 1 << 20
 
 
 def load_results(json_path='nonprofit_impact_report.json'):
-    """Load impact assessment results from JSON."""
+    """Load impact assessment results from JSON (parsed with orjson when available)."""
+    if orjson is not None:
+        with open(json_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD_BYTES:
+                return orjson.loads(f.read())
+            # Let the kernel page large reports in on demand; orjson parses the mapping directly
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
     with open(json_path, 'r') as f:
         return json.load(f)
 
 
-def create_program_cost_table(data):
+# Markup shared by every table: a bordered table with a caption and one header row
+_TABLE_OPEN = '\n<table border="1" cellpadding="8" cellspacing="0">\n'
+_TABLE_CLOSE = '    </tbody>\n</table>\n'
+
+
+def _thead(*headers):
+    """Header row for the given column titles, followed by the opening <tbody>."""
+    cells = "".join(f'            <th>{header}</th>\n' for header in headers)
+    return f'    <thead>\n        <tr>\n{cells}        </tr>\n    </thead>\n    <tbody>\n'
+
+
+_THEAD_STEP_CALC_VALUE = _thead('Step', 'Calculation', 'Value')
+_THEAD_STEP_PARAM_VALUE = _thead('Step', 'Parameter', 'Value')
+
+
+def _wrap_table(caption, thead, rows):
+    """Assemble a complete table from its caption, header markup and body rows."""
+    return "".join((_TABLE_OPEN, f'    <caption><strong>{caption}</strong></caption>\n', thead, rows, _TABLE_CLOSE))
+
+
+def _item_rows(items):
+    """Cost table rows after the first of a category, joined from (item, amount) pairs."""
+    return "".join(f"""
+        <tr>
+            <td>{item}</td>
+            <td align="right">{cost:,}</td>
+        </tr>
+""" for item, cost in items)
+
+
+@lru_cache(maxsize=1)
+def create_program_cost_table():
     """
     Table 1: Program Cost Calculation Breakdown
     Shows how the annual budget was calculated.
-    """
-    # Note: This uses the default estimates from NonprofitCostCalculator
-    # Adjust these to match your actual staff costs
-    
-    staff_costs = {
-        'Workshop Facilitator 1 (Part-time)': 2_000_000,
-        'Workshop Facilitator 2 (Part-time)': 2_000_000,
-        'Workshop Facilitator 3 (Part-time)': 2_000_000,
-        'Lead Outreach Coordinator (Full-time)': 3_000_000,
-        'Program Coordinator (Full-time)': 1_500_000,
-        'Admin Support (10% allocation)': 500_000,
-    }
-    
-    operating_costs = {
-        'Workshop Materials': 300_000,
-        'Transportation': 400_000,
-        'Hotline Infrastructure (Phone/Software)': 200_000,
-        'Staff Training': 150_000,
-        'Outreach Materials': 200_000,
-        'Miscellaneous Supplies': 150_000,
-    }
     
-    total_staff = sum(staff_costs.values())
-    benefits = total_staff * 0.15
-    total_operating = sum(operating_costs.values())
+    Built only from the module-level cost constants, so the HTML is rendered
+    once per process and cached.
+    """
+    total_staff = TOTAL_STAFF_COST
+    # Integer arithmetic keeps every amount an exact yen value, with no float round trip
+    benefits = total_staff * 15 // 100
+    total_operating = TOTAL_OPERATING_COST
     total_program = total_staff + benefits + total_operating
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 1: Annual Program Cost Calculation</strong></caption>
-    <thead>
-        <tr>
-            <th>Cost Category</th>
-            <th>Item</th>
-            <th>Amount (JPY)</th>
-        </tr>
-    </thead>
-    <tbody>
-"""
+    # Collect fragments and join once at the end rather than growing one string
+    parts = []
     
     # Staff costs
-    html += """
+    # One iterator yields the rowspan row, then the remaining rows, without copying the table
+    staff_rows = iter(STAFF_COSTS)
+    first_item, first_cost = next(staff_rows)
+    parts.append(f"""
         <tr>
-            <td rowspan="{}" valign="top"><strong>Staff Costs</strong></td>
-            <td>{}</td>
-            <td align="right">{:,}</td>
+            <td rowspan="{len(STAFF_COSTS)}" valign="top"><strong>Staff Costs</strong></td>
+            <td>{first_item}</td>
+            <td align="right">{first_cost:,}</td>
         </tr>
-""".format(len(staff_costs), list(staff_costs.keys())[0], list(staff_costs.values())[0])
+""")
     
-    for item, cost in list(staff_costs.items())[1:]:
-        html += """
-        <tr>
-            <td>{}</td>
-            <td align="right">{:,}</td>
-        </tr>
-""".format(item, cost)
+    parts.append(_item_rows(staff_rows))
     
-    html += """
+    parts.append(f"""
         <tr>
             <td colspan="2" align="right"><strong>Subtotal Staff</strong></td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{total_staff:,}</strong></td>
         </tr>
-""".format(total_staff)
+""")
     
     # Benefits
-    html += """
+    parts.append(f"""
         <tr>
             <td colspan="2"><strong>Benefits (15% of staff costs)</strong></td>
-            <td align="right">{:,}</td>
+            <td align="right">{benefits:,}</td>
         </tr>
-""".format(int(benefits))
+""")
     
     # Operating costs
-    html += """
+    operating_rows = iter(OPERATING_COSTS)
+    first_item, first_cost = next(operating_rows)
+    parts.append(f"""
         <tr>
-            <td rowspan="{}" valign="top"><strong>Operating Costs</strong></td>
-            <td>{}</td>
-            <td align="right">{:,}</td>
+            <td rowspan="{len(OPERATING_COSTS)}" valign="top"><strong>Operating Costs</strong></td>
+            <td>{first_item}</td>
+            <td align="right">{first_cost:,}</td>
         </tr>
-""".format(len(operating_costs), list(operating_costs.keys())[0], list(operating_costs.values())[0])
+""")
     
-    for item, cost in list(operating_costs.items())[1:]:
-        html += """
-        <tr>
-            <td>{}</td>
-            <td align="right">{:,}</td>
-        </tr>
-""".format(item, cost)
+    parts.append(_item_rows(operating_rows))
     
-    html += """
+    parts.append(f"""
         <tr>
             <td colspan="2" align="right"><strong>Subtotal Operating</strong></td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{total_operating:,}</strong></td>
         </tr>
-""".format(total_operating)
+""")
     
     # Total
-    html += """
+    parts.append(f"""
         <tr>
             <td colspan="2" align="right"><strong>TOTAL ANNUAL PROGRAM COST</strong></td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{total_program:,}</strong></td>
         </tr>
-""".format(int(total_program))
+""")
     
-    html += """
-    </tbody>
-</table>
-"""
+    # Table 1 has always had a blank line before </tbody>
+    parts.append("\n")
     
-    return html
+    return _wrap_table(
+        'Table 1: Annual Program Cost Calculation',
+        _thead('Cost Category', 'Item', 'Amount (JPY)'),
+        "".join(parts)
+    )
 
 
 def create_reach_calculation_table(data):
@@ -130,24 +178,13 @@ def create_reach_calculation_table(data):
     """
     reach = data['reach_metrics']
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 2: Program Reach Calculation</strong></caption>
-    <thead>
-        <tr>
-            <th>Step</th>
-            <th>Calculation</th>
-            <th>Value</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr>
+    rows = f"""        <tr>
             <td colspan="3"><strong>A. School-Based Workshops</strong></td>
         </tr>
         <tr>
             <td>1</td>
             <td>Schools reached</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['schools_reached']:,}</td>
         </tr>
         <tr>
             <td>2</td>
@@ -157,7 +194,7 @@ def create_reach_calculation_table(data):
         <tr>
             <td>3</td>
             <td>Students in workshops (1 × 2)</td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{reach['students_in_workshops']:,}</strong></td>
         </tr>
         <tr>
             <td colspan="3"><strong>B. Crisis Hotline</strong></td>
@@ -165,7 +202,7 @@ def create_reach_calculation_table(data):
         <tr>
             <td>4</td>
             <td>Total hotline contacts (raw)</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['hotline_contacts_raw']:,}</td>
         </tr>
         <tr>
             <td>5</td>
@@ -175,7 +212,7 @@ def create_reach_calculation_table(data):
         <tr>
             <td>6</td>
             <td>Unique hotline contacts (4 × 5)</td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{reach['unique_hotline_contacts']:,}</strong></td>
         </tr>
         <tr>
             <td colspan="3"><strong>C. Total Program Reach</strong></td>
@@ -183,7 +220,7 @@ def create_reach_calculation_table(data):
         <tr>
             <td>7</td>
             <td>Total individuals reached (3 + 6)</td>
-            <td align="right"><strong>{:,}</strong></td>
+            <td align="right"><strong>{reach['total_individuals_reached']:,}</strong></td>
         </tr>
         <tr>
             <td colspan="3"><strong>D. National Coverage</strong></td>
@@ -191,38 +228,26 @@ def create_reach_calculation_table(data):
         <tr>
             <td>8</td>
             <td>Total schools in Japan</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['total_schools_japan']:,}</td>
         </tr>
         <tr>
             <td>9</td>
             <td>School coverage rate (1 ÷ 8)</td>
-            <td align="right">{:.2f}%</td>
+            <td align="right">{reach['school_coverage_pct']:.2f}%</td>
         </tr>
         <tr>
             <td>10</td>
             <td>National student population (8 × 2)</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['national_student_population']:,}</td>
         </tr>
         <tr>
             <td>11</td>
             <td>Population coverage rate (7 ÷ 10)</td>
-            <td align="right">{:.2f}%</td>
-        </tr>
-    </tbody>
-</table>
-""".format(
-        reach['schools_reached'],
-        reach['students_in_workshops'],
-        reach['hotline_contacts_raw'],
-        reach['unique_hotline_contacts'],
-        reach['total_individuals_reached'],
-        reach['total_schools_japan'],
-        reach['school_coverage_pct'],
-        reach['national_student_population'],
-        reach['population_coverage_pct']
-    )
+            <td align="right">{reach['population_coverage_pct']:.2f}%</td>
+        </tr>
+"""
     
-    return html
+    return _wrap_table('Table 2: Program Reach Calculation', _THEAD_STEP_CALC_VALUE, rows)
 
 
 def create_baseline_risk_table(data):
@@ -234,39 +259,28 @@ def create_baseline_risk_table(data):
     reach = data['reach_metrics']
     baseline = data['baseline_risk']
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 3: Baseline Risk Calculation</strong></caption>
-    <thead>
-        <tr>
-            <th>Step</th>
-            <th>Parameter</th>
-            <th>Value</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr>
+    rows = f"""        <tr>
             <td colspan="3"><strong>A. National Youth Suicide Data (Age 10-19)</strong></td>
         </tr>
         <tr>
             <td>1</td>
             <td>Data period</td>
-            <td>{}</td>
+            <td>{youth_data['year_range']}</td>
         </tr>
         <tr>
             <td>2</td>
             <td>Total youth suicides</td>
-            <td align="right">{:,}</td>
+            <td align="right">{youth_data['total_suicides']:,}</td>
         </tr>
         <tr>
             <td>3</td>
             <td>Annual average deaths</td>
-            <td align="right">{:.1f}</td>
+            <td align="right">{youth_data['annual_average']:.1f}</td>
         </tr>
         <tr>
             <td>4</td>
-            <td>Most recent year ({})</td>
-            <td align="right">{:,}</td>
+            <td>Most recent year ({youth_data['most_recent_year']})</td>
+            <td align="right">{youth_data['most_recent_year_count']:,}</td>
         </tr>
         <tr>
             <td>5</td>
@@ -276,7 +290,7 @@ def create_baseline_risk_table(data):
         <tr>
             <td>6</td>
             <td>Suicide rate per 100,000 (3 ÷ 5 × 100,000)</td>
-            <td align="right"><strong>{:.2f}</strong></td>
+            <td align="right"><strong>{baseline['suicide_rate_per_100k']:.2f}</strong></td>
         </tr>
         <tr>
             <td colspan="3"><strong>B. Expected Deaths in Reached Population</strong></td>
@@ -284,32 +298,19 @@ def create_baseline_risk_table(data):
         <tr>
             <td>7</td>
             <td>Individuals reached by program</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['total_individuals_reached']:,}</td>
         </tr>
         <tr>
             <td>8</td>
             <td>Expected deaths (7 ÷ 100,000 × 6)</td>
-            <td align="right"><strong>{:.3f}</strong></td>
-        </tr>
-        <tr>
-            <td colspan="3"><em>Interpretation: Without intervention, we expect {:.3f} deaths annually in our reached population of {:,} individuals.</em></td>
-        </tr>
-    </tbody>
-</table>
-""".format(
-        youth_data['year_range'],
-        youth_data['total_suicides'],
-        youth_data['annual_average'],
-        youth_data['most_recent_year'],
-        youth_data['most_recent_year_count'],
-        baseline['suicide_rate_per_100k'],
-        reach['total_individuals_reached'],
-        baseline['expected_deaths_no_intervention'],
-        baseline['expected_deaths_no_intervention'],
-        reach['total_individuals_reached']
-    )
+            <td align="right"><strong>{baseline['expected_deaths_no_intervention']:.3f}</strong></td>
+        </tr>
+        <tr>
+            <td colspan="3"><em>Interpretation: Without intervention, we expect {baseline['expected_deaths_no_intervention']:.3f} deaths annually in our reached population of {reach['total_individuals_reached']:,} individuals.</em></td>
+        </tr>
+"""
     
-    return html
+    return _wrap_table('Table 3: Baseline Risk Calculation', _THEAD_STEP_PARAM_VALUE, rows)
 
 
 def create_scenario_comparison_table(data):
@@ -318,120 +319,116 @@ def create_scenario_comparison_table(data):
     Shows results under different effectiveness assumptions.
     """
     scenarios = data['impact_scenarios']
+    who = data['who_assessment']
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 4: Cost-Effectiveness Scenarios</strong></caption>
-    <thead>
-        <tr>
-            <th>Metric</th>
-            <th>Conservative<br>(15% effectiveness)</th>
-            <th>Moderate<br>(25% effectiveness)</th>
-            <th>Optimistic<br>(35% effectiveness)</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr>
+    # Bind each scenario and its nested sections once; the template below reads them by name
+    c, m, o = scenarios['conservative'], scenarios['moderate'], scenarios['optimistic']
+    c_life, m_life, o_life = c['lifetime_value_per_person'], m['lifetime_value_per_person'], o['lifetime_value_per_person']
+    c_agg, m_agg, o_agg = c['aggregate_economic_impact'], m['aggregate_economic_impact'], o['aggregate_economic_impact']
+    c_roi, m_roi, o_roi = c['return_on_investment'], m['return_on_investment'], o['return_on_investment']
+    who_c, who_m, who_o = who['conservative'], who['moderate'], who['optimistic']
+    
+    rows = f"""        <tr>
             <td colspan="4"><strong>Impact Metrics</strong></td>
         </tr>
         <tr>
             <td>Lives Saved Annually</td>
-            <td align="right">{:.3f}</td>
-            <td align="right">{:.3f}</td>
-            <td align="right">{:.3f}</td>
+            <td align="right">{c['lives_saved_annually']:.3f}</td>
+            <td align="right">{m['lives_saved_annually']:.3f}</td>
+            <td align="right">{o['lives_saved_annually']:.3f}</td>
         </tr>
         <tr>
             <td>DALYs Averted (Years)</td>
-            <td align="right">{:.1f}</td>
-            <td align="right">{:.1f}</td>
-            <td align="right">{:.1f}</td>
+            <td align="right">{c['dalys_averted']:.1f}</td>
+            <td align="right">{m['dalys_averted']:.1f}</td>
+            <td align="right">{o['dalys_averted']:.1f}</td>
         </tr>
         <tr>
             <td>Years of Life per Person Saved</td>
-            <td align="right">{}</td>
-            <td align="right">{}</td>
-            <td align="right">{}</td>
+            <td align="right">{c['years_of_life_per_person']}</td>
+            <td align="right">{m['years_of_life_per_person']}</td>
+            <td align="right">{o['years_of_life_per_person']}</td>
         </tr>
         <tr>
             <td colspan="4"><strong>Cost-Effectiveness</strong></td>
         </tr>
         <tr>
             <td>Cost per Life Saved (JPY)</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
+            <td align="right">¥{c['cost_per_life_saved_jpy']:,.0f}</td>
+            <td align="right">¥{m['cost_per_life_saved_jpy']:,.0f}</td>
+            <td align="right">¥{o['cost_per_life_saved_jpy']:,.0f}</td>
         </tr>
         <tr>
             <td>Cost per Life Saved (Million JPY)</td>
-            <td align="right">¥{:.1f}M</td>
-            <td align="right">¥{:.1f}M</td>
-            <td align="right">¥{:.1f}M</td>
+            <td align="right">¥{c['cost_per_life_saved_million']:.1f}M</td>
+            <td align="right">¥{m['cost_per_life_saved_million']:.1f}M</td>
+            <td align="right">¥{o['cost_per_life_saved_million']:.1f}M</td>
         </tr>
         <tr>
             <td>Cost per DALY (JPY)</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
+            <td align="right">¥{c['cost_per_daly_jpy']:,.0f}</td>
+            <td align="right">¥{m['cost_per_daly_jpy']:,.0f}</td>
+            <td align="right">¥{o['cost_per_daly_jpy']:,.0f}</td>
         </tr>
         <tr>
             <td>Cost per DALY (USD)</td>
-            <td align="right">${:,.0f}</td>
-            <td align="right">${:,.0f}</td>
-            <td align="right">${:,.0f}</td>
+            <td align="right">${c['cost_per_daly_usd']:,.0f}</td>
+            <td align="right">${m['cost_per_daly_usd']:,.0f}</td>
+            <td align="right">${o['cost_per_daly_usd']:,.0f}</td>
         </tr>
         <tr>
             <td>Cost per Person Reached (JPY)</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
+            <td align="right">¥{c['cost_per_person_reached_jpy']:,.0f}</td>
+            <td align="right">¥{m['cost_per_person_reached_jpy']:,.0f}</td>
+            <td align="right">¥{o['cost_per_person_reached_jpy']:,.0f}</td>
         </tr>
         <tr>
             <td colspan="4"><strong>Economic Value Created</strong></td>
         </tr>
         <tr>
             <td>Lifetime Gross Earnings per Person</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
+            <td align="right">¥{c_life['gross_earnings_jpy']:,.0f}</td>
+            <td align="right">¥{m_life['gross_earnings_jpy']:,.0f}</td>
+            <td align="right">¥{o_life['gross_earnings_jpy']:,.0f}</td>
         </tr>
         <tr>
             <td>Tax Revenue per Person (25% rate)</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
-            <td align="right">¥{:,.0f}</td>
+            <td align="right">¥{c_life['tax_revenue_jpy']:,.0f}</td>
+            <td align="right">¥{m_life['tax_revenue_jpy']:,.0f}</td>
+            <td align="right">¥{o_life['tax_revenue_jpy']:,.0f}</td>
         </tr>
         <tr>
             <td>Total Economic Value Saved</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
+            <td align="right">¥{c_agg['total_economic_value_million']:.0f}M</td>
+            <td align="right">¥{m_agg['total_economic_value_million']:.0f}M</td>
+            <td align="right">¥{o_agg['total_economic_value_million']:.0f}M</td>
         </tr>
         <tr>
             <td>Total Tax Revenue Saved</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
+            <td align="right">¥{c_agg['total_tax_revenue_million']:.0f}M</td>
+            <td align="right">¥{m_agg['total_tax_revenue_million']:.0f}M</td>
+            <td align="right">¥{o_agg['total_tax_revenue_million']:.0f}M</td>
         </tr>
         <tr>
             <td>Net Benefit (Economic Value - Program Cost)</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
-            <td align="right">¥{:.0f}M</td>
+            <td align="right">¥{c_agg['net_benefit_million']:.0f}M</td>
+            <td align="right">¥{m_agg['net_benefit_million']:.0f}M</td>
+            <td align="right">¥{o_agg['net_benefit_million']:.0f}M</td>
         </tr>
         <tr>
             <td colspan="4"><strong>Return on Investment</strong></td>
         </tr>
         <tr>
             <td>ROI (Gross Earnings Basis)</td>
-            <td align="right">{:.1f}x</td>
-            <td align="right">{:.1f}x</td>
-            <td align="right">{:.1f}x</td>
+            <td align="right">{c_roi['roi_gross_earnings']:.1f}x</td>
+            <td align="right">{m_roi['roi_gross_earnings']:.1f}x</td>
+            <td align="right">{o_roi['roi_gross_earnings']:.1f}x</td>
         </tr>
         <tr>
             <td>ROI (Tax Revenue Basis)</td>
-            <td align="right">{:.1f}x</td>
-            <td align="right">{:.1f}x</td>
-            <td align="right">{:.1f}x</td>
+            <td align="right">{c_roi['roi_tax_revenue']:.1f}x</td>
+            <td align="right">{m_roi['roi_tax_revenue']:.1f}x</td>
+            <td align="right">{o_roi['roi_tax_revenue']:.1f}x</td>
         </tr>
         <tr>
             <td colspan="4"><strong>WHO Cost-Effectiveness Classification</strong></td>
@@ -444,69 +441,22 @@ def create_scenario_comparison_table(data):
         </tr>
         <tr>
             <td>Times Below WHO Threshold ($34,000)</td>
-            <td align="right">{:.0f}x</td>
-            <td align="right">{:.0f}x</td>
-            <td align="right">{:.0f}x</td>
-        </tr>
-    </tbody>
-</table>
-""".format(
-        # Impact metrics
-        scenarios['conservative']['lives_saved_annually'],
-        scenarios['moderate']['lives_saved_annually'],
-        scenarios['optimistic']['lives_saved_annually'],
-        scenarios['conservative']['dalys_averted'],
-        scenarios['moderate']['dalys_averted'],
-        scenarios['optimistic']['dalys_averted'],
-        scenarios['conservative']['years_of_life_per_person'],
-        scenarios['moderate']['years_of_life_per_person'],
-        scenarios['optimistic']['years_of_life_per_person'],
-        # Cost-effectiveness
-        scenarios['conservative']['cost_per_life_saved_jpy'],
-        scenarios['moderate']['cost_per_life_saved_jpy'],
-        scenarios['optimistic']['cost_per_life_saved_jpy'],
-        scenarios['conservative']['cost_per_life_saved_million'],
-        scenarios['moderate']['cost_per_life_saved_million'],
-        scenarios['optimistic']['cost_per_life_saved_million'],
-        scenarios['conservative']['cost_per_daly_jpy'],
-        scenarios['moderate']['cost_per_daly_jpy'],
-        scenarios['optimistic']['cost_per_daly_jpy'],
-        scenarios['conservative']['cost_per_daly_usd'],
-        scenarios['moderate']['cost_per_daly_usd'],
-        scenarios['optimistic']['cost_per_daly_usd'],
-        scenarios['conservative']['cost_per_person_reached_jpy'],
-        scenarios['moderate']['cost_per_person_reached_jpy'],
-        scenarios['optimistic']['cost_per_person_reached_jpy'],
-        # Economic value
-        scenarios['conservative']['lifetime_value_per_person']['gross_earnings_jpy'],
-        scenarios['moderate']['lifetime_value_per_person']['gross_earnings_jpy'],
-        scenarios['optimistic']['lifetime_value_per_person']['gross_earnings_jpy'],
-        scenarios['conservative']['lifetime_value_per_person']['tax_revenue_jpy'],
-        scenarios['moderate']['lifetime_value_per_person']['tax_revenue_jpy'],
-        scenarios['optimistic']['lifetime_value_per_person']['tax_revenue_jpy'],
-        scenarios['conservative']['aggregate_economic_impact']['total_economic_value_million'],
-        scenarios['moderate']['aggregate_economic_impact']['total_economic_value_million'],
-        scenarios['optimistic']['aggregate_economic_impact']['total_economic_value_million'],
-        scenarios['conservative']['aggregate_economic_impact']['total_tax_revenue_million'],
-        scenarios['moderate']['aggregate_economic_impact']['total_tax_revenue_million'],
-        scenarios['optimistic']['aggregate_economic_impact']['total_tax_revenue_million'],
-        scenarios['conservative']['aggregate_economic_impact']['net_benefit_million'],
-        scenarios['moderate']['aggregate_economic_impact']['net_benefit_million'],
-        scenarios['optimistic']['aggregate_economic_impact']['net_benefit_million'],
-        # ROI
-        scenarios['conservative']['return_on_investment']['roi_gross_earnings'],
-        scenarios['moderate']['return_on_investment']['roi_gross_earnings'],
-        scenarios['optimistic']['return_on_investment']['roi_gross_earnings'],
-        scenarios['conservative']['return_on_investment']['roi_tax_revenue'],
-        scenarios['moderate']['return_on_investment']['roi_tax_revenue'],
-        scenarios['optimistic']['return_on_investment']['roi_tax_revenue'],
-        # WHO
-        data['who_assessment']['conservative']['times_below_threshold'],
-        data['who_assessment']['moderate']['times_below_threshold'],
-        data['who_assessment']['optimistic']['times_below_threshold']
-    )
+            <td align="right">{who_c['times_below_threshold']:.0f}x</td>
+            <td align="right">{who_m['times_below_threshold']:.0f}x</td>
+            <td align="right">{who_o['times_below_threshold']:.0f}x</td>
+        </tr>
+"""
     
-    return html
+    return _wrap_table(
+        'Table 4: Cost-Effectiveness Scenarios',
+        _thead(
+            'Metric',
+            'Conservative<br>(15% effectiveness)',
+            'Moderate<br>(25% effectiveness)',
+            'Optimistic<br>(35% effectiveness)'
+        ),
+        rows
+    )
 
 
 def create_lives_saved_calculation_table(data):
@@ -518,31 +468,20 @@ def create_lives_saved_calculation_table(data):
     moderate = data['impact_scenarios']['moderate']
     reach = data['reach_metrics']
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 5: Lives Saved Calculation (Moderate Scenario)</strong></caption>
-    <thead>
-        <tr>
-            <th>Step</th>
-            <th>Calculation</th>
-            <th>Value</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr>
+    rows = f"""        <tr>
             <td>1</td>
             <td>Individuals reached by program</td>
-            <td align="right">{:,}</td>
+            <td align="right">{reach['total_individuals_reached']:,}</td>
         </tr>
         <tr>
             <td>2</td>
             <td>Youth suicide rate (per 100,000)</td>
-            <td align="right">{:.2f}</td>
+            <td align="right">{baseline['suicide_rate_per_100k']:.2f}</td>
         </tr>
         <tr>
             <td>3</td>
             <td>Expected deaths without intervention (1 ÷ 100,000 × 2)</td>
-            <td align="right">{:.3f}</td>
+            <td align="right">{baseline['expected_deaths_no_intervention']:.3f}</td>
         </tr>
         <tr>
             <td>4</td>
@@ -552,7 +491,7 @@ def create_lives_saved_calculation_table(data):
         <tr>
             <td>5</td>
             <td><strong>Lives saved (3 × 4)</strong></td>
-            <td align="right"><strong>{:.3f}</strong></td>
+            <td align="right"><strong>{moderate['lives_saved_annually']:.3f}</strong></td>
         </tr>
         <tr>
             <td>6</td>
@@ -567,12 +506,12 @@ def create_lives_saved_calculation_table(data):
         <tr>
             <td>8</td>
             <td>Years of life saved per person (7 - 6)</td>
-            <td align="right">{} years</td>
+            <td align="right">{moderate['years_of_life_per_person']} years</td>
         </tr>
         <tr>
             <td>9</td>
             <td><strong>Total DALYs averted (5 × 8)</strong></td>
-            <td align="right"><strong>{:.1f} years</strong></td>
+            <td align="right"><strong>{moderate['dalys_averted']:.1f} years</strong></td>
         </tr>
         <tr>
             <td>10</td>
@@ -582,28 +521,16 @@ def create_lives_saved_calculation_table(data):
         <tr>
             <td>11</td>
             <td><strong>Cost per life saved (10 ÷ 5)</strong></td>
-            <td align="right"><strong>¥{:,.0f}</strong></td>
+            <td align="right"><strong>¥{moderate['cost_per_life_saved_jpy']:,.0f}</strong></td>
         </tr>
         <tr>
             <td>12</td>
             <td><strong>Cost per DALY averted (10 ÷ 9)</strong></td>
-            <td align="right"><strong>¥{:,.0f} (~${:,.0f})</strong></td>
-        </tr>
-    </tbody>
-</table>
-""".format(
-        reach['total_individuals_reached'],
-        baseline['suicide_rate_per_100k'],
-        baseline['expected_deaths_no_intervention'],
-        moderate['lives_saved_annually'],
-        moderate['years_of_life_per_person'],
-        moderate['dalys_averted'],
-        moderate['cost_per_life_saved_jpy'],
-        moderate['cost_per_daly_jpy'],
-        moderate['cost_per_daly_usd']
-    )
+            <td align="right"><strong>¥{moderate['cost_per_daly_jpy']:,.0f} (~${moderate['cost_per_daly_usd']:,.0f})</strong></td>
+        </tr>
+"""
     
-    return html
+    return _wrap_table('Table 5: Lives Saved Calculation (Moderate Scenario)', _THEAD_STEP_CALC_VALUE, rows)
 
 
 def create_economic_value_calculation_table(data):
@@ -612,19 +539,11 @@ def create_economic_value_calculation_table(data):
     Shows how lifetime earnings were calculated.
     """
     moderate = data['impact_scenarios']['moderate']
+    life = moderate['lifetime_value_per_person']
+    agg = moderate['aggregate_economic_impact']
+    roi = moderate['return_on_investment']
     
-    html = """
-<table border="1" cellpadding="8" cellspacing="0">
-    <caption><strong>Table 6: Economic Value Calculation (Per Life Saved)</strong></caption>
-    <thead>
-        <tr>
-            <th>Step</th>
-            <th>Parameter</th>
-            <th>Value</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr>
+    rows = f"""        <tr>
             <td>1</td>
             <td>Average age at prevention</td>
             <td align="right">17 years</td>
@@ -637,7 +556,7 @@ def create_economic_value_calculation_table(data):
         <tr>
             <td>3</td>
             <td>Working years remaining (2 - 1)</td>
-            <td align="right">{} years</td>
+            <td align="right">{moderate['work_years_per_person']} years</td>
         </tr>
         <tr>
             <td>4</td>
@@ -647,7 +566,7 @@ def create_economic_value_calculation_table(data):
         <tr>
             <td>5</td>
             <td><strong>Lifetime gross earnings (3 × 4)</strong></td>
-            <td align="right"><strong>¥{:,}</strong></td>
+            <td align="right"><strong>¥{life['gross_earnings_jpy']:,}</strong></td>
         </tr>
         <tr>
             <td>6</td>
@@ -657,7 +576,7 @@ def create_economic_value_calculation_table(data):
         <tr>
             <td>7</td>
             <td><strong>Lifetime tax revenue (5 × 6)</strong></td>
-            <td align="right"><strong>¥{:,}</strong></td>
+            <td align="right"><strong>¥{life['tax_revenue_jpy']:,}</strong></td>
         </tr>
         <tr>
             <td colspan="3"><strong>Aggregate Impact (Moderate Scenario)</strong></td>
@@ -665,17 +584,17 @@ def create_economic_value_calculation_table(data):
         <tr>
             <td>8</td>
             <td>Lives saved annually</td>
-            <td align="right">{:.3f}</td>
+            <td align="right">{moderate['lives_saved_annually']:.3f}</td>
         </tr>
         <tr>
             <td>9</td>
             <td>Total economic value saved (5 × 8)</td>
-            <td align="right">¥{:.0f}M</td>
+            <td align="right">¥{agg['total_economic_value_million']:.0f}M</td>
         </tr>
         <tr>
             <td>10</td>
             <td>Total tax revenue saved (7 × 8)</td>
-            <td align="right">¥{:.0f}M</td>
+            <td align="right">¥{agg['total_tax_revenue_million']:.0f}M</td>
         </tr>
         <tr>
             <td>11</td>
@@ -685,73 +604,122 @@ def create_economic_value_calculation_table(data):
         <tr>
             <td>12</td>
             <td><strong>Net economic benefit (9 - 11)</strong></td>
-            <td align="right"><strong>¥{:.0f}M</strong></td>
+            <td align="right"><strong>¥{agg['net_benefit_million']:.0f}M</strong></td>
         </tr>
         <tr>
             <td>13</td>
             <td><strong>ROI - Gross earnings basis (9 ÷ 11)</strong></td>
-            <td align="right"><strong>{:.1f}x</strong></td>
+            <td align="right"><strong>{roi['roi_gross_earnings']:.1f}x</strong></td>
         </tr>
         <tr>
             <td>14</td>
             <td><strong>ROI - Tax revenue basis (10 ÷ 11)</strong></td>
-            <td align="right"><strong>{:.1f}x</strong></td>
-        </tr>
-    </tbody>
-</table>
-""".format(
-        moderate['work_years_per_person'],
-        moderate['lifetime_value_per_person']['gross_earnings_jpy'],
-        moderate['lifetime_value_per_person']['tax_revenue_jpy'],
-        moderate['lives_saved_annually'],
-        moderate['aggregate_economic_impact']['total_economic_value_million'],
-        moderate['aggregate_economic_impact']['total_tax_revenue_million'],
-        moderate['aggregate_economic_impact']['net_benefit_million'],
-        moderate['return_on_investment']['roi_gross_earnings'],
-        moderate['return_on_investment']['roi_tax_revenue']
-    )
+            <td align="right"><strong>{roi['roi_tax_revenue']:.1f}x</strong></td>
+        </tr>
+"""
     
-    return html
+    return _wrap_table('Table 6: Economic Value Calculation (Per Life Saved)', _THEAD_STEP_PARAM_VALUE, rows)
 
 
-def save_table_html(table_html, filename):
-    """Save individual table as standalone HTML file."""
-    html = """<!DOCTYPE html>
+def output_path(filename):
+    """Path a table is actually written to, depending on GZIP_OUTPUT."""
+    return filename + '.gz' if GZIP_OUTPUT else filename
+
+
+def _open_output(path):
+    if GZIP_OUTPUT:
+        # Level 1 compresses in the same pass as the write at almost no CPU cost
+        return gzip.open(path, 'wb', compresslevel=1)
+    # Large enough that the whole page reaches the kernel in a single write at close
+    return open(path, 'wb', buffering=1 << 20)
+
+
+# Page boilerplate around each table, encoded to UTF-8 once at import
+_PAGE_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{}</title>
+    <title>""".encode('utf-8')
+_PAGE_BODY = """</title>
 </head>
 <body>
-{}
+""".encode('utf-8')
+_PAGE_TAIL = """
 </body>
 </html>
-""".format(filename.replace('.html', '').replace('_', ' ').title(), table_html)
+""".encode('utf-8')
+
+
+def save_table_html(table_html, filename):
+    """Save individual table as standalone HTML file."""
+    title = filename.replace('.html', '').replace('_', ' ').title()
+    path = output_path(filename)
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Stream the page around the table instead of formatting a second full copy of it;
+    # only the title and the table itself still need encoding
+    with _open_output(path) as f:
+        f.writelines((_PAGE_HEAD, title.encode('utf-8'), _PAGE_BODY, table_html.encode('utf-8'), _PAGE_TAIL))
     
-    return filename
+    return path
 
 
-if __name__ == "__main__":
+# Output file -> builder taking the loaded report; table 1 needs only the cost constants
+TABLES = {
+    'table1_program_cost.html': lambda data: create_program_cost_table(),
+    'table2_reach_calculation.html': create_reach_calculation_table,
+    'table3_baseline_risk.html': create_baseline_risk_table,
+    'table4_scenario_comparison.html': create_scenario_comparison_table,
+    'table5_lives_saved_calculation.html': create_lives_saved_calculation_table,
+    'table6_economic_value_calculation.html': create_economic_value_calculation_table,
+}
+
+# Digest of the report and module source the tables on disk were generated from; plain and
+# gzipped tables are separate outputs, so each mode records its own
+TABLES_DIGEST_FILE = '.tables.gz.digest' if GZIP_OUTPUT else '.tables.digest'
+
+def tables_digest(json_path):
+    """Hash the report and this module's source; the tables only change when either does."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in (json_path, __file__):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def tables_up_to_date(digest):
+    """True if every table exists and was generated from inputs with this digest."""
+    if not all(os.path.exists(output_path(filename)) for filename in TABLES):
+        return False
+    try:
+        with open(TABLES_DIGEST_FILE, 'r') as f:
+            return f.read() == digest
+    except FileNotFoundError:
+        return False
+
+
+def main(json_path='nonprofit_impact_report.json'):
+    digest = tables_digest(json_path)
+    if tables_up_to_date(digest):
+        print(f"Tables are up to date with {json_path}; nothing to regenerate.")
+        return
+    
     # Load data
-    data = load_results('nonprofit_impact_report.json')
+    data = load_results(json_path)
     
     # Generate all tables
-    tables = {
-        'table1_program_cost.html': create_program_cost_table(data),
-        'table2_reach_calculation.html': create_reach_calculation_table(data),
-        'table3_baseline_risk.html': create_baseline_risk_table(data),
-        'table4_scenario_comparison.html': create_scenario_comparison_table(data),
-        'table5_lives_saved_calculation.html': create_lives_saved_calculation_table(data),
-        'table6_economic_value_calculation.html': create_economic_value_calculation_table(data),
-    }
+    tables = {filename: build(data) for filename, build in TABLES.items()}
     
     # Save each table as separate HTML
     for filename, table_html in tables.items():
-        save_table_html(table_html, filename)
-        print(f"✓ {filename}")
+        print(f"✓ {save_table_html(table_html, filename)}")
+    
+    # Record the inputs only once every table has been written
+    with open(TABLES_DIGEST_FILE, 'w') as f:
+        f.write(digest)
     
-    print("All tables generated successfully!")
\ No newline at end of file
+    print("All tables generated successfully!")
+
+
+if __name__ == "__main__":
+    main()
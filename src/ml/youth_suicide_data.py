@@ -10,33 +10,43 @@ Date: 2025
 import pandas as pd
 import numpy as np
 import json
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class NonprofitCostCalculator:
     """
     Calculate actual program operating costs.
+    
+    Cost tables are read-only after construction, so the totals are computed once
+    per calculator and reused across calls.
     """
     
     def __init__(self):
         # Staff costs (annual, JPY)
-        self.staff_costs = {
+        self.staff_costs = MappingProxyType({
             'workshop_facilitator_1': 2_000_000,     # Part-time
             'workshop_facilitator_2': 2_000_000,     # Part-time
             'workshop_facilitator_3': 2_000_000,     # Part-time
             'lead_outreach_coordinator': 3_000_000,   # Full-time
             'program_director': 5_000_000,        # Full-time
             'admin_support': 500_000,                # Shared resource (10% allocation)
-        }
+        })
         
         # Operating costs (annual, JPY)
-        self.operating_costs = {
+        self.operating_costs = MappingProxyType({
             'workshop_materials': 300_000,
             'transportation': 400_000,
             'hotline_infrastructure': 200_000,      # Phone/software subscription
             'staff_training': 150_000,
             'outreach_materials': 200_000,
             'misc_supplies': 150_000,
-        }
+        })
         
         # Benefits rate (social insurance, pension, etc.)
         self.benefits_rate = 0.15  # 15% of salary costs
@@ -47,8 +57,13 @@ class NonprofitCostCalculator:
         Calculate total annual program cost.
         
         Returns:
-            dict: Breakdown of costs
+            dict: Breakdown of costs (shared between calls; do not mutate)
         """
+        return self._total_cost
+    
+    
+    @cached_property
+    def _total_cost(self):
         total_staff = sum(self.staff_costs.values())
         total_benefits = total_staff * self.benefits_rate
         total_operating = sum(self.operating_costs.values())
@@ -61,8 +76,8 @@ class NonprofitCostCalculator:
             'total_program_cost_jpy': total_program_cost,
             'total_program_cost_million': total_program_cost / 1_000_000,
             'breakdown': {
-                'staff': self.staff_costs,
-                'operating': self.operating_costs
+                'staff': dict(self.staff_costs),
+                'operating': dict(self.operating_costs)
             }
         }
 
@@ -118,26 +133,29 @@ class ProgramImpactModel:
             dict: Processed youth suicide statistics
         """
         try:
-            df = pd.read_csv(filepath)
+            # Only the three columns used below are parsed
+            df = pd.read_csv(filepath, usecols=['year', '年齢層', '人数_x'])
             
-            # Filter for youth age group (10-19)
-            youth_df = df[df['年齢層'] == '10～19歳'].copy()
+            # Filter for youth age group (10-19) with one mask; everything after works on arrays
+            mask = (df['年齢層'] == '10～19歳').to_numpy()
             
-            if youth_df.empty:
+            if not mask.any():
                 raise ValueError("No data found for age group '10～19歳'")
             
-            # Get suicide counts
-            youth_df['suicides'] = pd.to_numeric(youth_df['人数_x'], errors='coerce')
-            youth_df = youth_df.dropna(subset=['suicides'])
+            # Get suicide counts, dropping rows without one
+            suicides = pd.to_numeric(df['人数_x'][mask], errors='coerce').to_numpy(dtype=float)
+            valid = ~np.isnan(suicides)
+            suicides = suicides[valid]
+            years = df['year'].to_numpy()[mask][valid]
             
             # Calculate statistics
-            total_suicides = youth_df['suicides'].sum()
-            years_span = youth_df['year'].max() - youth_df['year'].min() + 1
+            first_year, most_recent_year = years.min(), years.max()
+            total_suicides = suicides.sum()
+            years_span = most_recent_year - first_year + 1
             annual_average = total_suicides / years_span
             
             # Get most recent year
-            most_recent_year = youth_df['year'].max()
-            most_recent_count = youth_df[youth_df['year'] == most_recent_year]['suicides'].values[0]
+            most_recent_count = suicides[years == most_recent_year][0]
             
             # Calculate rate per 100,000
             # Japan youth population (10-19) approximately 11 million (2023)
@@ -150,7 +168,7 @@ class ProgramImpactModel:
                 'most_recent_year': int(most_recent_year),
                 'most_recent_year_count': int(most_recent_count),
                 'rate_per_100k': float(rate_per_100k),
-                'year_range': f"{youth_df['year'].min()}-{youth_df['year'].max()}",
+                'year_range': f"{first_year}-{most_recent_year}",
                 'data_source': filepath
             }
             
@@ -238,45 +256,57 @@ class ProgramImpactModel:
             'optimistic': 0.35     # 35% reduction (combined school + hotline)
         }
         
-        results = {}
+        # Per-person values do not depend on the scenario
+        years_of_life = self.life_expectancy_japan - avg_age_at_prevention
+        work_years = self.retirement_age - avg_age_at_prevention
+        lifetime_gross_earnings = work_years * self.avg_annual_salary
+        lifetime_tax_revenue = lifetime_gross_earnings * self.effective_tax_rate
+        cost_per_person_reached = self.program_cost / population
         
-        for scenario_name, effectiveness in scenarios.items():
-            lives_saved = expected_deaths * effectiveness
-            
-            # Years of life saved
-            years_of_life = self.life_expectancy_japan - avg_age_at_prevention
-            dalys_averted = lives_saved * years_of_life
-            
-            # Economic value
-            work_years = self.retirement_age - avg_age_at_prevention
-            lifetime_gross_earnings = work_years * self.avg_annual_salary
-            lifetime_tax_revenue = lifetime_gross_earnings * self.effective_tax_rate
-            
-            total_economic_value = lives_saved * lifetime_gross_earnings
-            total_tax_revenue = lives_saved * lifetime_tax_revenue
-            
-            # Cost-effectiveness
-            cost_per_life = self.program_cost / lives_saved if lives_saved > 0 else 0
-            cost_per_daly = self.program_cost / dalys_averted if dalys_averted > 0 else 0
-            cost_per_person_reached = self.program_cost / population
-            
-            # ROI
-            roi_gross = total_economic_value / self.program_cost if self.program_cost > 0 else 0
-            roi_tax = total_tax_revenue / self.program_cost if self.program_cost > 0 else 0
-            
-            # Net benefit
-            net_benefit = total_economic_value - self.program_cost
-            
-            results[scenario_name] = {
-                'effectiveness_rate': effectiveness,
-                'lives_saved_annually': lives_saved,
-                'dalys_averted': dalys_averted,
+        # Every scenario metric is one vector expression over the effectiveness rates
+        effectiveness = np.array(list(scenarios.values()))
+        lives_saved = expected_deaths * effectiveness
+        dalys_averted = lives_saved * years_of_life
+        
+        # Economic value
+        total_economic_value = lives_saved * lifetime_gross_earnings
+        total_tax_revenue = lives_saved * lifetime_tax_revenue
+        
+        # Cost-effectiveness (0 where nothing is saved)
+        cost_per_life = np.divide(self.program_cost, lives_saved,
+                                  out=np.zeros_like(lives_saved), where=lives_saved > 0)
+        cost_per_daly = np.divide(self.program_cost, dalys_averted,
+                                  out=np.zeros_like(dalys_averted), where=dalys_averted > 0)
+        
+        # ROI
+        if self.program_cost > 0:
+            roi_gross = total_economic_value / self.program_cost
+            roi_tax = total_tax_revenue / self.program_cost
+        else:
+            roi_gross = roi_tax = np.zeros_like(lives_saved)
+        
+        # Net benefit
+        net_benefit = total_economic_value - self.program_cost
+        
+        # Back to native floats, one row per scenario
+        columns = zip(
+            effectiveness.tolist(), lives_saved.tolist(), dalys_averted.tolist(),
+            cost_per_life.tolist(), cost_per_daly.tolist(),
+            total_economic_value.tolist(), total_tax_revenue.tolist(), net_benefit.tolist(),
+            roi_gross.tolist(), roi_tax.tolist()
+        )
+        
+        results = {
+            scenario_name: {
+                'effectiveness_rate': eff,
+                'lives_saved_annually': lives,
+                'dalys_averted': dalys,
                 'years_of_life_per_person': years_of_life,
                 'work_years_per_person': work_years,
-                'cost_per_life_saved_jpy': cost_per_life,
-                'cost_per_life_saved_million': cost_per_life / 1_000_000,
-                'cost_per_daly_jpy': cost_per_daly,
-                'cost_per_daly_usd': cost_per_daly / 150,  # Approx exchange rate
+                'cost_per_life_saved_jpy': cpl,
+                'cost_per_life_saved_million': cpl / 1_000_000,
+                'cost_per_daly_jpy': cpd,
+                'cost_per_daly_usd': cpd / 150,  # Approx exchange rate
                 'cost_per_person_reached_jpy': cost_per_person_reached,
                 'lifetime_value_per_person': {
                     'gross_earnings_jpy': lifetime_gross_earnings,
@@ -285,18 +315,21 @@ class ProgramImpactModel:
                     'tax_revenue_million': lifetime_tax_revenue / 1_000_000
                 },
                 'aggregate_economic_impact': {
-                    'total_economic_value_jpy': total_economic_value,
-                    'total_economic_value_million': total_economic_value / 1_000_000,
-                    'total_tax_revenue_jpy': total_tax_revenue,
-                    'total_tax_revenue_million': total_tax_revenue / 1_000_000,
-                    'net_benefit_jpy': net_benefit,
-                    'net_benefit_million': net_benefit / 1_000_000
+                    'total_economic_value_jpy': econ,
+                    'total_economic_value_million': econ / 1_000_000,
+                    'total_tax_revenue_jpy': tax,
+                    'total_tax_revenue_million': tax / 1_000_000,
+                    'net_benefit_jpy': net,
+                    'net_benefit_million': net / 1_000_000
                 },
                 'return_on_investment': {
-                    'roi_gross_earnings': roi_gross,
-                    'roi_tax_revenue': roi_tax
+                    'roi_gross_earnings': roi_g,
+                    'roi_tax_revenue': roi_t
                 }
             }
+            for scenario_name, (eff, lives, dalys, cpl, cpd, econ, tax, net, roi_g, roi_t)
+            in zip(scenarios, columns)
+        }
         
         return results
     
@@ -309,29 +342,46 @@ class ProgramImpactModel:
             cost_per_daly_usd: Cost per DALY in USD
             
         Returns:
-            dict: Assessment results
+            dict: Assessment results (see classify_cost_per_daly)
         """
-        # WHO thresholds (using Japan's GDP per capita ~$34,000)
-        highly_effective_threshold = 34_000
-        cost_effective_threshold = 102_000  # 3× GDP per capita
-        
-        if cost_per_daly_usd < highly_effective_threshold:
-            classification = "HIGHLY COST-EFFECTIVE"
-            times_below_threshold = highly_effective_threshold / cost_per_daly_usd
-        elif cost_per_daly_usd < cost_effective_threshold:
-            classification = "COST-EFFECTIVE"
-            times_below_threshold = cost_effective_threshold / cost_per_daly_usd
-        else:
-            classification = "ABOVE THRESHOLD"
-            times_below_threshold = 0
+        return classify_cost_per_daly(cost_per_daly_usd)
+
+
+@lru_cache(maxsize=1024)
+def classify_cost_per_daly(cost_per_daly_usd):
+    """
+    Classify a cost per DALY against WHO thresholds.
+    
+    Memoized, since report generation and parameter sweeps repeat the same values;
+    the returned dict is shared between calls and must not be mutated.
+    
+    Args:
+        cost_per_daly_usd: Cost per DALY in USD
         
-        return {
-            'classification': classification,
-            'who_threshold_highly_effective_usd': highly_effective_threshold,
-            'who_threshold_cost_effective_usd': cost_effective_threshold,
-            'program_cost_per_daly_usd': cost_per_daly_usd,
-            'times_below_threshold': times_below_threshold
-        }
+    Returns:
+        dict: Assessment results
+    """
+    # WHO thresholds (using Japan's GDP per capita ~$34,000)
+    highly_effective_threshold = 34_000
+    cost_effective_threshold = 102_000  # 3× GDP per capita
+    
+    if cost_per_daly_usd < highly_effective_threshold:
+        classification = "HIGHLY COST-EFFECTIVE"
+        times_below_threshold = highly_effective_threshold / cost_per_daly_usd
+    elif cost_per_daly_usd < cost_effective_threshold:
+        classification = "COST-EFFECTIVE"
+        times_below_threshold = cost_effective_threshold / cost_per_daly_usd
+    else:
+        classification = "ABOVE THRESHOLD"
+        times_below_threshold = 0
+    
+    return {
+        'classification': classification,
+        'who_threshold_highly_effective_usd': highly_effective_threshold,
+        'who_threshold_cost_effective_usd': cost_effective_threshold,
+        'program_cost_per_daly_usd': cost_per_daly_usd,
+        'times_below_threshold': times_below_threshold
+    }
 
 
 def generate_program_report(schools=145, workshops=97, hotline=9000, actual_budget=None,
@@ -480,8 +530,17 @@ def generate_program_report(schools=145, workshops=97, hotline=9000, actual_budg
         }
     }
     
-    with open('nonprofit_impact_report.json', 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, default=float)
+    # orjson encodes NumPy scalars natively; anything else falls back to float as before
+    if orjson is not None:
+        with open('nonprofit_impact_report.json', 'wb') as f:
+            f.write(orjson.dumps(
+                output,
+                default=float,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
+    else:
+        with open('nonprofit_impact_report.json', 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, default=float)
     
     print("\n" + "="*80)
     print("Data exported to: nonprofit_impact_report.json")
@@ -1,23 +1,27 @@
+import mmap
+import os
+import numpy as np
 import pandas as pd
-import re
 
 # --- CONFIG ---
 csv_file = "52091693-99e4-417b-a87e-8773698fb549.csv"
 out_file = "processed_suicide_data.csv"
 
 # --- UTILS ---
-def japanese_year_to_western(j_year):
-    """Convert Japanese era year to western year."""
-    j_year = str(j_year).strip()
-    if j_year.startswith("S"):
-        return 1925 + int(re.sub(r"\D", "", j_year))
-    elif j_year.startswith("H"):
-        return 1988 + int(re.sub(r"\D", "", j_year))
-    else:
-        try:
-            return int(j_year)
-        except ValueError:
-            return None
+# First year of each era minus one, so western year = offset + era year
+ERA_OFFSETS = {"S": 1925, "H": 1988}
+
+def japanese_years_to_western(years):
+    """Convert Japanese era years (e.g. "H27", "S60") or plain western years to western years; unparseable years become NaN."""
+    years = years.astype(str).str.strip()
+    # Era-prefixed years: offset of the leading letter plus the digits that follow it
+    era_offset = years.str[:1].map(ERA_OFFSETS)
+    era_years = pd.to_numeric(years.str[1:].str.replace(r"\D", "", regex=True), errors="coerce")
+    # Anything else must already be a plain western year
+    plain_years = pd.to_numeric(years, errors="coerce")
+    western = (era_offset + era_years).where(era_offset.notna(), plain_years)
+    # Float with NaN for missing years, as the row-by-row conversion returned, so output formatting is unchanged
+    return western.astype("float64")
 
 age_mapping = {
     "～19歳": "0-19",
@@ -32,22 +36,30 @@ age_mapping = {
     "不詳": "Unknown"
 }
 
+# Era years are read as text; age columns keep inferred dtypes, so plain numeric counts skip
+# the string clean-up in age_column_counts. Keys for columns a file does not have are ignored
+DTYPES = {"年": "str", "年度": "str"}
+
 # --- READ CSV ---
 # skip initial rows until the header row with age bins is detected
-df_raw = pd.read_csv(csv_file, header=None, encoding="utf-8")
+# Search the raw bytes of the memory-mapped file for the first age bin, then count the
+# newlines before it to get the header's line number; no rows are parsed to find it
+HEADER_NEEDLE = "～19歳".encode("utf-8")
 
-# detect header row by searching for "～19歳"
-header_row_idx = None
-for i, row in df_raw.iterrows():
-    if any("～19歳" in str(cell) for cell in row):
-        header_row_idx = i
-        break
+header_line = None
+with open(csv_file, "rb") as f:
+    if os.fstat(f.fileno()).st_size:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.find(HEADER_NEEDLE)
+            if pos >= 0:
+                header_line = mm[:pos].count(b"\n")
 
-if header_row_idx is None:
+if header_line is None:
     raise ValueError("Could not find header row with age bins.")
 
-# read CSV again with correct header
-df = pd.read_csv(csv_file, header=header_row_idx, encoding="utf-8")
+# single full read starting at the header; skiprows counts physical lines, blank ones included
+df = pd.read_csv(csv_file, skiprows=header_line, header=0, encoding="utf-8",
+                 dtype=DTYPES, engine="c", memory_map=True)
 
 # --- CLEAN DATA ---
 # Remove completely empty rows
@@ -57,26 +69,37 @@ df = df.dropna(how="all")
 age_cols = [col for col in df.columns if col in age_mapping]
 id_vars = [col for col in df.columns if col not in age_cols]
 
-df_melt = df.melt(id_vars=id_vars, value_vars=age_cols, 
-                  var_name="age_group", value_name="suicides")
-
-# Normalize age bins
-df_melt["age_group"] = df_melt["age_group"].map(age_mapping)
+def age_column_counts(col):
+    """Numeric counts for one age column; only text columns need thousands separators stripped."""
+    if not pd.api.types.is_numeric_dtype(col):
+        col = col.str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(col, errors="coerce").to_numpy()
 
-# Clean numeric values
-df_melt["suicides"] = df_melt["suicides"].astype(str).str.replace(",", "").str.strip()
-df_melt["suicides"] = pd.to_numeric(df_melt["suicides"], errors="coerce")
+# Stack the age columns directly, in the row order melt would produce (every row of the
+# first age column, then the next), with age bins already normalized
+n_rows = len(df)
+df_melt = pd.DataFrame({
+    **{col: np.tile(df[col].to_numpy(), len(age_cols)) for col in id_vars},
+    "age_group": np.repeat([age_mapping[col] for col in age_cols], n_rows),
+    "suicides": np.concatenate([age_column_counts(df[col]) for col in age_cols]),
+})
+df_melt["suicides"] = pd.to_numeric(df_melt["suicides"], downcast="integer")
 
 # Standardize year if needed
 if "年" in df_melt.columns or "年度" in df_melt.columns:
     year_col = "年" if "年" in df_melt.columns else "年度"
-    df_melt["year"] = df_melt[year_col].apply(japanese_year_to_western)
+    df_melt["year"] = japanese_years_to_western(df_melt[year_col])
 else:
-    df_melt["year"] = df_melt.iloc[:,0].apply(japanese_year_to_western)
+    df_melt["year"] = japanese_years_to_western(df_melt.iloc[:,0])
 
 # Optional: keep only relevant columns
 columns_keep = ["year", "age_group", "suicides"] + [col for col in id_vars if col not in ["年", "年度"]]
-df_final = df_melt[columns_keep]
+# Compact dtypes for the saved frame: complete years fit in int16 and the few age bins become a category
+# (suicides was already downcast when it was converted; columns with gaps stay float)
+df_final = df_melt[columns_keep].assign(
+    year=lambda d: pd.to_numeric(d["year"], downcast="integer"),
+    age_group=lambda d: d["age_group"].astype("category"),
+)
 
 # --- SAVE CLEAN CSV ---
 df_final.to_csv(out_file, index=False, encoding="utf-8-sig")
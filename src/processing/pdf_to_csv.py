@@ -1,17 +1,31 @@
 from pathlib import Path
 import argparse
+import contextlib
+import csv
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List
 
 try:
     import pdfplumber
-    import pandas as pd
 except ImportError as e:
     print("Missing required package: {}".format(e.name if hasattr(e, 'name') else e))
     print("Please install requirements: pip install -r requirements.txt")
     sys.exit(1)
 
+# Optional: PyMuPDF finds ruled tables in C; pdfplumber remains the fallback
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+
+# Manifests of previously extracted PDFs, keyed by PDF content and pdfplumber version
+CACHE_DIR = Path(".cache") / "pdf_tables"
+
 
 def find_pdfs(pdf_dir: Path, recursive: bool = False) -> List[Path]:
     if recursive:
@@ -19,54 +33,135 @@ def find_pdfs(pdf_dir: Path, recursive: bool = False) -> List[Path]:
     return sorted(pdf_dir.glob("*.pdf"))
 
 
-def extract_tables_from_pdf(pdf_path: Path, out_dir: Path) -> int:
+def pdf_cache_key(pdf_path: Path) -> str:
+    """Hash of the PDF bytes, name and extractor versions; changes whenever the output could differ."""
+    digest = hashlib.sha1(pdf_path.read_bytes())
+    # Output CSVs are named after the PDF, so identical copies under other names need their own entry
+    digest.update(pdf_path.name.encode())
+    digest.update(getattr(pdfplumber, "__version__", "").encode())
+    if pymupdf is not None:
+        digest.update(pymupdf.VersionBind.encode())
+    return digest.hexdigest()
+
+
+def cached_tables(manifest_path: Path, out_dir: Path):
+    """Return the CSV names recorded in a manifest if they all still exist in out_dir, else None."""
+    try:
+        names = json.loads(manifest_path.read_text(encoding="utf-8"))["tables"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if all((out_dir / name).exists() for name in names):
+        return names
+    return None
+
+
+def open_pymupdf(pdf_path: Path):
+    """Open pdf_path with PyMuPDF, or return an empty context when it is not installed."""
+    if pymupdf is None:
+        return contextlib.nullcontext()
+    return pymupdf.open(str(pdf_path))
+
+
+def extract_page_tables(page, mupdf_page=None):
+    """Tables on one page as lists of rows, via PyMuPDF when available.
+
+    Falls back to pdfplumber when PyMuPDF is missing or finds no table on the page.
+    """
+    if mupdf_page is not None:
+        tables = [tab.extract() for tab in mupdf_page.find_tables().tables]
+        if tables:
+            return tables
+    return page.extract_tables()
+
+
+def iter_tables(pdf_path: Path, failures: list):
+    """Yield (page_idx, tbl_idx, rows) for every non-empty table in pdf_path, page by page.
+
+    Pages whose tables cannot be extracted are reported and appended to failures.
+    """
+    with pdfplumber.open(str(pdf_path)) as pdf, open_pymupdf(pdf_path) as mupdf_doc:
+        for page_idx, page in enumerate(pdf.pages):
+            # Each table is returned as a list of rows
+            try:
+                mupdf_page = mupdf_doc[page_idx] if mupdf_doc is not None else None
+                page_tables = extract_page_tables(page, mupdf_page)
+            except Exception as e:
+                print(f"Warning: failed to extract tables from {pdf_path.name} page {page_idx+1}: {e}")
+                failures.append(e)
+                continue
+
+            # pages without tables yield nothing
+            for tbl_idx, table in enumerate(page_tables or []):
+                if table:
+                    yield page_idx, tbl_idx, table
+
+
+def write_table_csv(table: list, out_path: Path) -> None:
+    """Write one extracted table (a list of rows) to out_path."""
+    # Heuristically treat first row as header if all elements are strings and not None
+    header = None
+    first_row = table[0]
+    if all(isinstance(c, str) for c in first_row):
+        header = first_row
+        data_rows = table[1:]
+    else:
+        data_rows = table
+
+    # Rows are already lists of strings (or None, written as empty cells),
+    # so they go straight to csv.writer; unnamed columns are numbered
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header if header is not None else range(len(first_row)))
+        writer.writerows(data_rows)
+
+
+def extract_tables_from_pdf(pdf_path: Path, out_dir: Path, cache_dir: Path = CACHE_DIR) -> int:
     """Extract tables from a single PDF and write CSVs to out_dir.
 
+    Tables are streamed from iter_tables and each is written as soon as its page
+    has been parsed. If cache_dir holds a manifest for this exact PDF and every
+    CSV it lists is still in out_dir, layout analysis is skipped. Pass
+    cache_dir=None to disable.
+
     Returns the number of tables written.
     """
-    tables_written = 0
+    manifest_path = None
+    if cache_dir is not None:
+        try:
+            manifest_path = cache_dir / f"{pdf_cache_key(pdf_path)}.meta.json"
+        except OSError:
+            # An unreadable PDF is a cache miss; opening it below reports the error
+            manifest_path = None
+    if manifest_path is not None:
+        names = cached_tables(manifest_path, out_dir)
+        if names is not None:
+            print(f"Cached: {pdf_path} ({len(names)} tables)")
+            return len(names)
+
+    written = []
+    # Only a run with no failures is recorded, so partial extractions are retried
+    failures = []
     try:
-        with pdfplumber.open(str(pdf_path)) as pdf:
-            for page_idx, page in enumerate(pdf.pages):
-                # pdfplumber's extract_tables returns a list of tables (list of rows)
-                try:
-                    page_tables = page.extract_tables()
-                except Exception as e:
-                    print(f"Warning: failed to extract tables from {pdf_path.name} page {page_idx+1}: {e}")
-                    continue
-
-                if not page_tables:
-                    # no tables found on this page
-                    continue
-
-                for tbl_idx, table in enumerate(page_tables):
-                    if not table:
-                        continue
-                    # table is list of rows; convert to DataFrame
-                    try:
-                        # Heuristically treat first row as header if all elements are strings and not None
-                        header = None
-                        first_row = table[0]
-                        if all(isinstance(c, str) for c in first_row):
-                            header = first_row
-                            data_rows = table[1:]
-                        else:
-                            data_rows = table
-
-                        df = pd.DataFrame(data_rows, columns=header) if header is not None else pd.DataFrame(data_rows)
-
-                        out_fname = f"{pdf_path.stem}_page{page_idx+1}_table{tbl_idx+1}.csv"
-                        out_path = out_dir / out_fname
-                        df.to_csv(out_path, index=False)
-                        tables_written += 1
-                        print(f"Wrote: {out_path}")
-                    except Exception as e:
-                        print(f"Error writing table {tbl_idx+1} from {pdf_path.name} page {page_idx+1}: {e}")
-                        continue
+        for page_idx, tbl_idx, table in iter_tables(pdf_path, failures):
+            out_fname = f"{pdf_path.stem}_page{page_idx+1}_table{tbl_idx+1}.csv"
+            out_path = out_dir / out_fname
+            try:
+                write_table_csv(table, out_path)
+            except Exception as e:
+                print(f"Error writing table {tbl_idx+1} from {pdf_path.name} page {page_idx+1}: {e}")
+                failures.append(e)
+                continue
+            written.append(out_fname)
+            print(f"Wrote: {out_path}")
     except Exception as e:
         print(f"Failed to open {pdf_path}: {e}")
+        failures.append(e)
 
-    return tables_written
+    if manifest_path is not None and not failures:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps({"pdf": pdf_path.name, "tables": written}), encoding="utf-8")
+
+    return len(written)
 
 
 def main():
@@ -77,6 +172,10 @@ def main():
                         help="Directory to write CSV files (default: data_raw/csvs)")
     parser.add_argument("--recursive", action="store_true", help="Recursively search pdf-dir for PDFs")
     parser.add_argument("--limit", type=int, default=0, help="Limit number of PDFs processed (0 = no limit)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of PDFs processed in parallel (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Re-extract every PDF instead of reusing manifests in {CACHE_DIR}")
 
     args = parser.parse_args()
 
@@ -94,15 +193,21 @@ def main():
         print(f"No PDF files found in {pdf_dir}")
         return
 
+    if args.limit:
+        pdfs = pdfs[:args.limit]
+
+    # Layout analysis is CPU-bound and each PDF writes its own uniquely named CSVs,
+    # so files are processed in separate worker processes
+    cache_dir = None if args.no_cache else CACHE_DIR
     total_tables = 0
-    processed = 0
-    for pdf_path in pdfs:
-        if args.limit and processed >= args.limit:
-            break
-        print(f"Processing: {pdf_path}")
-        n = extract_tables_from_pdf(pdf_path, out_dir)
-        total_tables += n
-        processed += 1
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = []
+        for pdf_path in pdfs:
+            print(f"Processing: {pdf_path}")
+            futures.append(executor.submit(extract_tables_from_pdf, pdf_path, out_dir, cache_dir))
+        for future in as_completed(futures):
+            total_tables += future.result()
+    processed = len(pdfs)
 
     print(f"Done. Processed {processed} PDFs. Wrote {total_tables} tables to {out_dir}")
 
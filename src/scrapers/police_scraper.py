@@ -1,15 +1,43 @@
+import json
+import logging
 import os
+import queue
+import re
+import shutil
+import sys
+import threading
 import time
-import random
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
 from urllib.parse import urljoin
 
 BASE_URL = "https://www.npa.go.jp/safetylife/seianki/jisatsu/"
 DOWNLOAD_DIR = "data/raw_downloads"
+# Year folders: Reiwa ("R0" anywhere) or Heisei (leading "H")
+YEAR_FOLDER_RE = re.compile(r"R0|^H")
+FILE_EXTENSIONS = (".pdf", ".csv")
+# Validators (ETag / Last-Modified) of downloaded files, kept next to them
+MANIFEST_NAME = ".manifest.json"
+# Validators and parsed file links of year folder pages, for revalidating listings
+LISTINGS_NAME = ".listings.json"
+# Concurrent requests to the site; kept well below the adapter's pool size
+MAX_WORKERS = 4
+# Request budget shared by all workers (requests per second, bursts up to the same count)
+REQUESTS_PER_SECOND = 2
+
+log = logging.getLogger(__name__)
 
 session = requests.Session()
 
+# Every request goes to the same host, so keep its connections pooled and alive
+# instead of paying a new TCP+TLS handshake per page or file
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
 session.headers.update({
     "User-Agent": (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -21,99 +49,285 @@ session.headers.update({
     "Connection": "keep-alive"
 })
 
-def safe_get(url):
+class RateLimiter:
+    """Token bucket shared across threads: at most `rate` requests per `period` seconds."""
+
+    def __init__(self, rate, period=1.0):
+        self.capacity = rate
+        self.tokens = rate
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Take a token now (the count may go negative, reserving a future slot) and
+        # sleep outside the lock until that slot arrives
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.fill_rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+def safe_get(url, timeout=10, stream=False, headers=None):
     for attempt in range(3):
         try:
-            resp = session.get(url, timeout=10)
+            rate_limiter.acquire()
+            resp = session.get(url, timeout=timeout, stream=stream, headers=headers)
             if resp.status_code == 403:
-                print(f"[403 BLOCKED] Attempt {attempt+1}, retrying...")
+                log.warning("403 blocked on attempt %d, retrying: %s", attempt + 1, url)
                 time.sleep(2 + attempt)
                 continue
             resp.raise_for_status()
             return resp
         except Exception as e:
-            print(f"[ERROR] {url}: {e}")
+            log.error("%s: %s", url, e)
             time.sleep(1)
     return None
 
-def list_year_folders():
-    print("[INFO] Fetching year folders...")
-    resp = safe_get(BASE_URL)
-    if resp is None:
-        print("[FAIL] Could not fetch base URL")
+def extract_hrefs(resp):
+    # lxml parses in C and the XPath returns the href strings directly
+    if not resp.content:
         return []
+    return lxml_html.fromstring(resp.content).xpath("//a/@href")
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def list_year_folders(base_url):
+    log.info("Fetching year folders...")
+    resp = safe_get(base_url)
+    if resp is None:
+        log.error("Could not fetch base URL")
+        return []
 
     folders = []
-    for a in soup.find_all("a"):
-        href = a.get("href")
+    for href in extract_hrefs(resp):
         if not href:
             continue
 
         # Recognize both Reiwa (R) and Heisei (H)
-        if ("R0" in href) or href.startswith("H"):
-            full = urljoin(BASE_URL, href)
+        if YEAR_FOLDER_RE.search(href):
+            full = urljoin(base_url, href)
             folders.append(full)
 
-    print(f"[INFO] Year folders found: {len(folders)}")
+    log.info("Year folders found: %d", len(folders))
     return folders
 
-def list_files_in_folder(folder_url):
-    resp = safe_get(folder_url)
+def validator_headers(entry):
+    # Conditional GET headers for a stored response's ETag / Last-Modified
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("lm"):
+        headers["If-Modified-Since"] = entry["lm"]
+    return headers
+
+def list_files_in_folder(folder_url, listings):
+    log.info("Scanning: %s", folder_url)
+    # Archived year folders rarely change: revalidate the stored listing, and on a 304
+    # reuse its links without downloading or parsing the page again
+    cached = listings.get(folder_url)
+    resp = safe_get(folder_url, headers=validator_headers(cached) if cached else None)
     if resp is None:
         return []
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+    if resp.status_code == 304:
+        return cached["files"]
 
     files = []
-    for a in soup.find_all("a"):
-        href = a.get("href")
+    for href in extract_hrefs(resp):
         if not href:
             continue
 
-        if href.endswith(".pdf") or href.endswith(".csv"):
+        if href.endswith(FILE_EXTENSIONS):
             files.append(urljoin(folder_url, href))
 
+    listings[folder_url] = {
+        "etag": resp.headers.get("ETag"),
+        "lm": resp.headers.get("Last-Modified"),
+        "files": files,
+    }
     return files
 
-def download_file(url, out_dir):
+def load_manifest(out_dir, name=MANIFEST_NAME):
+    try:
+        with open(os.path.join(out_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(out_dir, manifest, name=MANIFEST_NAME):
     os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def body_length(headers):
+    # A short body can be checked (and resumed) against Content-Length only when it is sent
+    # unencoded, since the bytes written to disk are then the bytes it counts
+    length = headers.get("Content-Length", "")
+    if headers.get("Content-Encoding") or not length.isdigit():
+        return None
+    return int(length)
+
+def download_file(url, out_dir, manifest, existing):
     filename = url.split("/")[-1]
     out_path = os.path.join(out_dir, filename)
 
-    if os.path.exists(out_path):
-        print(f"[SKIP] {filename} exists")
-        return
+    # Files downloaded with validators are revalidated with a conditional GET, so
+    # unchanged ones cost a 304 and no body; older files without them are kept as they are
+    conditional = {}
+    if filename in existing:
+        conditional = validator_headers(manifest.get(url, {}))
+        if not conditional:
+            log.info("Skipping %s: already exists", filename)
+            return
 
-    print(f"[DOWNLOAD] {filename}")
-    resp = safe_get(url)
+    log.info("Checking %s" if conditional else "Downloading %s", filename)
+    resp = safe_get(url, timeout=30, stream=True, headers=conditional or None)
     if resp is None:
-        print(f"[ERROR] Failed to download {filename}")
+        log.error("Failed to download %s", filename)
         return
 
-    with open(out_path, "wb") as f:
-        f.write(resp.content)
+    if resp.status_code == 304:
+        resp.close()
+        log.info("Not modified: %s", filename)
+        return
 
-    # Random throttle to look human
-    time.sleep(random.uniform(1.2, 2.2))
+    # Stream the body to disk in 64 KiB chunks instead of holding the whole file in memory;
+    # it lands under a temporary name so an interrupted download is not mistaken for a done one
+    part_path = out_path + ".part"
+    headers = resp.headers
+    expected = body_length(headers)
 
-def main():
-    print("[START] Japanese Police Suicide Stats Scraper")
+    written = 0
+    for attempt in range(3):
+        error = None
+        try:
+            with resp, open(part_path, "ab" if written else "wb") as f:
+                resp.raw.decode_content = True
+                shutil.copyfileobj(resp.raw, f, length=1 << 16)
+        except Exception as e:
+            error = e
+        written = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected is None or written >= expected or attempt == 2:
+            break
+
+        # Ask only for the missing tail; If-Range makes the server send the whole file
+        # instead if it changed in the meantime
+        log.warning("Resuming %s at byte %d of %d", filename, written, expected)
+        resume = {"Range": f"bytes={written}-"}
+        if headers.get("ETag") or headers.get("Last-Modified"):
+            resume["If-Range"] = headers.get("ETag") or headers["Last-Modified"]
+        resp = safe_get(url, timeout=30, stream=True, headers=resume)
+        if resp is None:
+            break
+        # Anything but a partial response is the whole (possibly changed) file again
+        if resp.status_code != 206:
+            headers = resp.headers
+            expected = body_length(headers)
+            written = 0
+
+    # Only a complete body is renamed into place, so the skip check never sees a truncated file
+    complete = written == expected if expected is not None else error is None
+    if not complete:
+        reason = error or f"{written:,} of {expected:,} bytes"
+        log.error("Failed to download %s: %s", filename, reason)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return
+
+    os.replace(part_path, out_path)
+    existing.add(filename)
+
+    manifest[url] = {
+        "etag": headers.get("ETag"),
+        "lm": headers.get("Last-Modified"),
+        "size": written,
+    }
+
+def content_length(url, existing):
+    # Files already on disk are only revalidated, so they carry no body to schedule for
+    if url.split("/")[-1] in existing:
+        return 0
+    try:
+        rate_limiter.acquire()
+        resp = session.head(url, timeout=10, allow_redirects=True)
+        # An error page's length says nothing about the file
+        if not resp.ok:
+            return 0
+        return int(resp.headers.get("Content-Length") or 0)
+    except (requests.RequestException, ValueError):
+        return 0
+
+def scrape(base_url, out_dir):
+    """Download every PDF/CSV under the year folders linked from base_url into out_dir.
 
-    year_folders = list_year_folders()
+    All requests share the module session (connection pool), and every run
+    against the same out_dir shares its download manifest.
+
+    Progress is reported through the module logger (log) at INFO level; only
+    main() sets up handlers, so callers that want those lines must
+    configure logging themselves (e.g. logging.basicConfig(level=logging.INFO)).
+    Warnings and errors still reach stderr without any configuration.
+    """
+    year_folders = list_year_folders(base_url)
     all_files = []
 
-    for folder in year_folders:
-        print(f"[INFO] Scanning: {folder}")
-        all_files.extend(list_files_in_folder(folder))
+    # Folder listings only wait on the network, so fetch them concurrently;
+    # map keeps the results in folder order
+    listings = load_manifest(out_dir, LISTINGS_NAME)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for files in executor.map(lambda folder: list_files_in_folder(folder, listings), year_folders):
+            all_files.extend(files)
+    save_manifest(out_dir, listings, LISTINGS_NAME)
 
-    print(f"[INFO] Total files discovered: {len(all_files)}")
+    log.info("Total files discovered: %d", len(all_files))
 
+    # Files are saved under their base name, so a link repeated on a page or in several
+    # year folders must go to a single worker; the first URL for each name is downloaded
+    by_name = {}
     for file_url in all_files:
-        download_file(file_url, DOWNLOAD_DIR)
+        filename = file_url.split("/")[-1]
+        if filename in by_name:
+            log.info("Skipping %s: already listed at %s", filename, by_name[filename])
+            continue
+        by_name[filename] = file_url
+    all_files = list(by_name.values())
+
+    # One directory read answers every "already downloaded?" check below
+    os.makedirs(out_dir, exist_ok=True)
+    existing = {entry.name for entry in os.scandir(out_dir) if entry.is_file()}
+
+    # Start the largest files first so a long download does not end up alone at the tail;
+    # HEAD requests read the sizes without transferring bodies
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        sizes = list(executor.map(lambda file_url: content_length(file_url, existing), all_files))
+    all_files = [url for _, url in sorted(zip(sizes, all_files), key=lambda pair: pair[0], reverse=True)]
+
+    # Downloads are network-bound too; the workers share the request budget, and they
+    # only add entries for their own URLs to the shared manifest
+    manifest = load_manifest(out_dir)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            list(executor.map(lambda file_url: download_file(file_url, out_dir, manifest, existing), all_files))
+    finally:
+        # Keep the validators of the files that did finish even if one download raised
+        save_manifest(out_dir, manifest)
+
+def main():
+    # Worker threads only enqueue records; a single listener thread writes them to stdout
+    log_queue = queue.Queue()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s", handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
 
-    print("[DONE] All downloads complete.")
+    try:
+        log.info("Japanese Police Suicide Stats Scraper")
+        scrape(BASE_URL, DOWNLOAD_DIR)
+        log.info("All downloads complete.")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()